@@ -0,0 +1,298 @@
+import argparse
+import os
+import sys
+from typing import Callable
+
+from . import benchmark
+from .batch import generate_many, read_puzzles, solve_many
+from .board import Board
+from .digging import SYMMETRIES
+from .generator import FILL_METHODS, SIZE_DIFFICULTIES
+from .grader import difficulty_of, grade_board
+from .hints import CandidateGrid
+from .library import LibraryError, PuzzleLibraryWriter
+from .solver import BACKENDS, Solver, has_conflicts
+
+# Command-line entry point for the algorithms alone: ``python -m algorithms``
+# never imports GTK. Puzzles are read and written one per line, see
+# Board.from_line, so the commands can be chained in pipelines.
+
+
+def for_each_puzzle(args: argparse.Namespace, work: Callable[[Board], str]) -> int:
+    # Prints ``work(board)`` for every puzzle; bad lines and unreadable
+    # files are reported on stderr and make the exit status 1 without
+    # stopping the run.
+    status = 0
+    for location, line, error in read_puzzles(args.files):
+        if error is not None:
+            print(f"{location}: {error}", file=sys.stderr)
+            status = 1
+            continue
+        try:
+            board = Board.from_line(line)
+            if has_conflicts(board):
+                raise ValueError("The givens break the rules")
+            print(work(board), flush=args.flush)
+        except ValueError as error:
+            print(f"{location}: {error}", file=sys.stderr)
+            status = 1
+    return status
+
+
+def generate(args: argparse.Namespace) -> int:
+    if args.difficulty not in SIZE_DIFFICULTIES[args.size]:
+        print(
+            f"No {args.difficulty} puzzles for a {args.size}x{args.size} board",
+            file=sys.stderr,
+        )
+        return 2
+    # Boards arrive in completion order and are printed in index order.
+    waiting: dict[int, Board] = {}
+    next_index = 0
+    for index, board, _, grade, in_band in generate_many(
+        args.count,
+        args.size,
+        args.difficulty,
+        workers=args.workers,
+        seed=args.seed,
+        unique=args.unique,
+        method=args.method,
+        symmetry=args.symmetry,
+        minimal=args.minimal,
+        graded=args.graded,
+        time_limit=args.time_limit,
+    ):
+        if in_band is False:
+            # Out of band after every attempt: still printed, as the
+            # closest found, but flagged.
+            print(f"puzzle {index}: graded {difficulty_of(grade)}", file=sys.stderr)
+        waiting[index] = board
+        while next_index in waiting:
+            print(waiting.pop(next_index).to_line(), flush=args.flush)
+            next_index += 1
+    return 0
+
+
+def solve(args: argparse.Namespace) -> int:
+    # Every input puzzle gets one output line, in order: its solution, or a
+    # "#" comment with the reason, so the output lines up with the input
+    # and can be piped into another command.
+    status = 0
+    for result in solve_many(
+        read_puzzles(args.files),
+        workers=args.workers,
+        backend=args.backend,
+        timeout=args.timeout,
+        chunk_size=args.chunk_size,
+    ):
+        if result.error is None:
+            print(result.solution, flush=args.flush)
+        else:
+            print(f"# {result.location}: {result.error}", flush=args.flush)
+            status = 1
+    return status
+
+
+def build_library(args: argparse.Namespace) -> int:
+    # Appends freshly generated puzzles, with their solutions and grade
+    # scores, to a library file for the game to serve.
+    if args.difficulty not in SIZE_DIFFICULTIES[args.size]:
+        print(
+            f"No {args.difficulty} puzzles for a {args.size}x{args.size} board",
+            file=sys.stderr,
+        )
+        return 2
+
+    def puzzles():
+        # Filed under the band the grader gives, which only differs from the
+        # requested one when graded generation missed it.
+        for _, puzzle, solution, grade, _ in generate_many(
+            args.count,
+            args.size,
+            args.difficulty,
+            workers=args.workers,
+            seed=args.seed,
+            graded=True,
+            time_limit=args.time_limit,
+        ):
+            yield puzzle, solution, difficulty_of(grade), grade.score
+
+    try:
+        with PuzzleLibraryWriter(args.library) as writer:
+            writer.append(puzzles())
+    except (OSError, LibraryError) as error:
+        print(f"{args.library}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def count_solutions(args: argparse.Namespace) -> int:
+    def work(board: Board) -> str:
+        return str(Solver(board, board.size, args.backend).count_solutions(args.limit))
+
+    return for_each_puzzle(args, work)
+
+
+def grade(args: argparse.Namespace) -> int:
+    def work(board: Board) -> str:
+        result = grade_board(board)
+        return f"{difficulty_of(result)} {result.score} {result.hardest}"
+
+    return for_each_puzzle(args, work)
+
+
+def hint(args: argparse.Namespace) -> int:
+    def work(board: Board) -> str:
+        found = CandidateGrid(board).hint()
+        if found is None:
+            return "-"
+        return f"{found.row + 1} {found.column + 1} {found.value} {found.technique}"
+
+    return for_each_puzzle(args, work)
+
+
+def add_input_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "files", nargs="*", help="puzzle files, one puzzle per line (default stdin)"
+    )
+    parser.add_argument(
+        "--flush", action="store_true", help="flush stdout after every line"
+    )
+
+
+def add_time_limit_argument(parser: argparse.ArgumentParser) -> None:
+    # A board that runs out of time is the closest to its band found so far,
+    # so seeded runs are only reproducible when no board hits the limit.
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=10.0,
+        help="seconds a graded puzzle may take before the closest one found is "
+        "used (default 10)",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m algorithms",
+        description="Generate, solve and grade Sudoku puzzles without the UI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_generate = commands.add_parser("generate", help="print new puzzles")
+    parser_generate.add_argument(
+        "--size", type=int, default=9, choices=sorted(SIZE_DIFFICULTIES)
+    )
+    parser_generate.add_argument(
+        "--difficulty",
+        type=str.upper,
+        default="MEDIUM",
+        choices=("EASY", "MEDIUM", "HARD", "EXPERT"),
+    )
+    parser_generate.add_argument("--count", type=int, default=1)
+    parser_generate.add_argument("--seed", type=int)
+    parser_generate.add_argument("--workers", type=int, default=1)
+    parser_generate.add_argument(
+        "--method", choices=FILL_METHODS, default="transform"
+    )
+    parser_generate.add_argument("--symmetry", choices=SYMMETRIES, default="none")
+    parser_generate.add_argument(
+        "--graded",
+        action="store_true",
+        help="dig until the grader puts the puzzle in the difficulty band",
+    )
+    add_time_limit_argument(parser_generate)
+    parser_generate.add_argument(
+        "--minimal",
+        action="store_true",
+        help="remove every clue that can go, whatever the difficulty",
+    )
+    parser_generate.add_argument(
+        "--unique",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="only print puzzles with a single solution (default)",
+    )
+    parser_generate.add_argument(
+        "--flush", action="store_true", help="flush stdout after every line"
+    )
+    parser_generate.set_defaults(run=generate)
+
+    parser_solve = commands.add_parser("solve", help="print the solution of puzzles")
+    parser_solve.add_argument("--backend", choices=BACKENDS, default="propagation")
+    parser_solve.add_argument("--workers", type=int, default=1)
+    parser_solve.add_argument(
+        "--timeout", type=float, help="seconds allowed per puzzle (default no limit)"
+    )
+    parser_solve.add_argument(
+        "--chunk-size", type=int, default=256, help="puzzles sent to a worker at once"
+    )
+    add_input_arguments(parser_solve)
+    parser_solve.set_defaults(run=solve)
+
+    parser_count = commands.add_parser(
+        "count-solutions", help="print how many solutions puzzles have"
+    )
+    parser_count.add_argument(
+        "--backend", choices=("dlx", "propagation"), default="propagation"
+    )
+    parser_count.add_argument(
+        "--limit", type=int, default=2, help="stop counting at this many (default 2)"
+    )
+    add_input_arguments(parser_count)
+    parser_count.set_defaults(run=count_solutions)
+
+    parser_grade = commands.add_parser(
+        "grade", help="print the difficulty, score and hardest technique of puzzles"
+    )
+    add_input_arguments(parser_grade)
+    parser_grade.set_defaults(run=grade)
+
+    parser_hint = commands.add_parser(
+        "hint", help="print the row, column, value and technique of the next step"
+    )
+    add_input_arguments(parser_hint)
+    parser_hint.set_defaults(run=hint)
+
+    parser_library = commands.add_parser(
+        "library", help="add generated puzzles to a puzzle library file"
+    )
+    parser_library.add_argument("library", help="library file, created if missing")
+    parser_library.add_argument(
+        "--size", type=int, default=9, choices=sorted(SIZE_DIFFICULTIES)
+    )
+    parser_library.add_argument(
+        "--difficulty",
+        type=str.upper,
+        default="MEDIUM",
+        choices=("EASY", "MEDIUM", "HARD", "EXPERT"),
+    )
+    parser_library.add_argument("--count", type=int, default=100)
+    parser_library.add_argument("--seed", type=int)
+    parser_library.add_argument("--workers", type=int, default=1)
+    add_time_limit_argument(parser_library)
+    parser_library.set_defaults(run=build_library)
+
+    parser_bench = commands.add_parser(
+        "bench", help="benchmark the solver and generator"
+    )
+    benchmark.build_parser(parser_bench)
+    parser_bench.set_defaults(run=benchmark.run)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except BrokenPipeError:
+        # The reader went away (``| head``); stop without a traceback when
+        # Python flushes stdout on exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import random
+from threading import Event
+
+from .board import Board
+from .constraints import ConstraintState, iter_values
+from .errors import SearchCancelled
+from .stats import SearchStats
+from .tasks import Steps
+
+
+class Backtracker:
+    # Depth-first fill of the empty cells of ``board`` in order, with an
+    # explicit stack so it can be paused after any guess and never recurses.
+    # ``board`` and ``constraints`` belong to the caller and are filled in
+    # place; ``constraints`` must hold the givens already on the board.
+    def __init__(
+        self,
+        board: Board,
+        constraints: ConstraintState,
+        cancel_event: Event | None = None,
+        stats: SearchStats | None = None,
+        shuffle: bool = False,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.board: Board = board
+        self.constraints: ConstraintState = constraints
+        self.size: int = board.size
+        # Tries the candidates of every cell in random order, for filling an
+        # empty board with a random solution, drawn from ``rng`` or the
+        # module-level generator of ``random``.
+        self.shuffle: bool = shuffle
+        self.rng = rng or random
+        self.cancel_event: Event | None = cancel_event
+        self.stats: SearchStats | None = stats
+
+    def steps(self) -> Steps:
+        # Returns whether the board was filled.
+        stats = self.stats
+        cells = self.board.cells
+        # A frame is a cell, its untried values and the value placed there,
+        # 0 for none yet.
+        stack: list[list] = []
+        index = cells.find(0)
+        if index < 0:
+            return True
+        stack.append(self.frame(index))
+        while stack:
+            frame = stack[-1]
+            index, values, tried = frame
+            row, column = divmod(index, self.size)
+            if tried:
+                cells[index] = 0
+                self.constraints.unplace(tried, row, column)
+                if stats is not None:
+                    stats.unplace(index, tried, len(stack))
+                frame[2] = 0
+            if not values:
+                stack.pop()
+                continue
+            value = frame[2] = values.pop()
+            cells[index] = value
+            self.constraints.place(value, row, column)
+            if stats is not None:
+                stats.place(index, value, len(stack))
+            yield
+            # Cells before this one are filled, so the scan goes on from here.
+            index = cells.find(0, index + 1)
+            if index < 0:
+                return True
+            stack.append(self.frame(index))
+        return False
+
+    def frame(self, index: int) -> list:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelled
+        candidates = self.constraints.candidates(*divmod(index, self.size))
+        if self.stats is not None:
+            self.stats.test(candidates.bit_count())
+        values = list(iter_values(candidates))
+        if self.shuffle:
+            self.rng.shuffle(values)
+        else:
+            # Popped from the end, so tried in increasing order.
+            values.reverse()
+        return [index, values, 0]
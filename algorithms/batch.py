@@ -0,0 +1,257 @@
+import fileinput
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple
+
+from .board import Board
+from .errors import SearchCancelled
+from .generator import Generator
+from .grader import Grade
+from .solver import Solver, has_conflicts
+
+
+class GeneratedPuzzle(NamedTuple):
+    index: int
+    board: Board
+    # The grid the board was dug from, so callers need not solve it again.
+    solution: Board
+    # For graded generation only, else None: the grade of the board and
+    # whether it is in the requested band.
+    grade: Grade | None
+    in_band: bool | None
+
+
+def generate_chunk(
+    first: int,
+    count: int,
+    size: int,
+    difficulty: str,
+    seed: int,
+    unique: bool,
+    method: str,
+    symmetry: str = "none",
+    minimal: bool = False,
+    graded: bool = False,
+    time_limit: float | None = None,
+) -> list[GeneratedPuzzle]:
+    puzzles = []
+    for index in range(first, first + count):
+        # Every board gets its own generator, so a board can be reproduced
+        # from (seed, index) alone, whichever worker or chunk produced it.
+        generator = Generator(
+            difficulty=difficulty,
+            size=size,
+            unique=unique,
+            method=method,
+            symmetry=symmetry,
+            minimal=minimal,
+            graded=graded,
+            rng=random.Random(f"{seed}-{index}"),
+            time_limit=time_limit,
+        )
+        board = generator.generate_board()
+        puzzles.append(
+            GeneratedPuzzle(
+                index, board, generator.solution, generator.grade, generator.in_band
+            )
+        )
+    return puzzles
+
+
+def generate_many(
+    count: int,
+    size: int = 9,
+    difficulty: str = "MEDIUM",
+    workers: int | None = None,
+    seed: int | None = None,
+    unique: bool = True,
+    method: str = "transform",
+    chunk_size: int = 16,
+    symmetry: str = "none",
+    minimal: bool = False,
+    graded: bool = False,
+    time_limit: float | None = None,
+) -> Iterator[GeneratedPuzzle]:
+    # Yields puzzles in completion order. At most two chunks per worker are
+    # in flight, so memory stays bounded for any count.
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    workers = workers or os.cpu_count() or 1
+    chunks = (
+        (first, min(chunk_size, count - first))
+        for first in range(0, count, chunk_size)
+    )
+
+    if workers == 1:
+        for first, length in chunks:
+            yield from generate_chunk(
+                first,
+                length,
+                size,
+                difficulty,
+                seed,
+                unique,
+                method,
+                symmetry,
+                minimal,
+                graded,
+                time_limit,
+            )
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending: set[Future] = set()
+        for first, length in chunks:
+            pending.add(
+                executor.submit(
+                    generate_chunk,
+                    first,
+                    length,
+                    size,
+                    difficulty,
+                    seed,
+                    unique,
+                    method,
+                    symmetry,
+                    minimal,
+                    graded,
+                    time_limit,
+                )
+            )
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in as_completed(pending):
+            yield from future.result()
+    finally:
+        # Stops queued chunks when the caller abandons the iterator early.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class PuzzleLine(NamedTuple):
+    # ``line`` is the first field of an input line, or None when the file
+    # could not be read, with the reason in ``error``.
+    location: str
+    line: str | None
+    error: str | None
+
+
+class SolveResult(NamedTuple):
+    # ``solution`` is a puzzle line, or None with the reason in ``error``.
+    location: str
+    solution: str | None
+    error: str | None
+
+
+class Deadline:
+    # Stands in for the cancel event of a search, and reads as set once
+    # ``seconds`` have passed. Cheaper than a timer thread per puzzle.
+    def __init__(self, seconds: float) -> None:
+        self.expires: float = time.monotonic() + seconds
+
+    def is_set(self) -> bool:
+        return time.monotonic() >= self.expires
+
+
+def read_puzzles(files: Iterable[str] = ()) -> Iterator[PuzzleLine]:
+    # Yields a PuzzleLine for every puzzle in ``files``, or stdin when there
+    # are none, one line at a time. Handles plain 81-character dumps and
+    # .sdm files alike: blank lines and "#" comments are skipped, and
+    # anything after the first field of a line (such as a rating) is ignored.
+    # A file that cannot be opened gives one PuzzleLine with the error, and
+    # the files after it are still read.
+    with fileinput.input(
+        tuple(files) or ("-",),
+        openhook=fileinput.hook_encoded("utf-8", errors="replace"),
+    ) as lines:
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except OSError as error:
+                yield PuzzleLine(lines.filename(), None, error.strerror or str(error))
+                continue
+            fields = line.split(maxsplit=1)
+            if fields and not fields[0].startswith("#"):
+                location = f"{lines.filename()}:{lines.filelineno()}"
+                yield PuzzleLine(location, fields[0], None)
+
+
+def solve_puzzle(
+    location: str, line: str, backend: str, timeout: float | None
+) -> SolveResult:
+    try:
+        board = Board.from_line(line)
+        if has_conflicts(board):
+            return SolveResult(location, None, "The givens break the rules")
+        cancel_event = None if timeout is None else Deadline(timeout)
+        solution = Solver(board, board.size, backend, cancel_event).solve_board()
+    except ValueError as error:
+        return SolveResult(location, None, str(error))
+    except SearchCancelled:
+        return SolveResult(location, None, f"Timed out after {timeout:g}s")
+    except Exception as error:
+        # A bug on one puzzle must not take the rest of the run with it.
+        return SolveResult(location, None, f"Failed: {error!r}")
+    if 0 in solution.cells:
+        return SolveResult(location, None, "No solution")
+    return SolveResult(location, solution.to_line(), None)
+
+
+def solve_chunk(
+    puzzles: list[PuzzleLine], backend: str, timeout: float | None
+) -> list[SolveResult]:
+    return [
+        (
+            SolveResult(location, None, error)
+            if error is not None
+            else solve_puzzle(location, line, backend, timeout)
+        )
+        for location, line, error in puzzles
+    ]
+
+
+def solve_many(
+    puzzles: Iterable[PuzzleLine],
+    workers: int | None = None,
+    backend: str = "propagation",
+    timeout: float | None = None,
+    chunk_size: int = 256,
+) -> Iterator[SolveResult]:
+    # Solves the puzzles of read_puzzles and yields one result each, in
+    # input order. Chunks are read from ``puzzles`` only as workers free up,
+    # and at most two per worker are in flight or waiting to be yielded,
+    # so memory stays flat however long the input is.
+    workers = workers or os.cpu_count() or 1
+    puzzles = iter(puzzles)
+    chunks = iter(lambda: list(islice(puzzles, chunk_size)), [])
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from solve_chunk(chunk, backend, timeout)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        in_flight: deque[Future] = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(solve_chunk, chunk, backend, timeout))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
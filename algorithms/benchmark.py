@@ -0,0 +1,332 @@
+import argparse
+import hashlib
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from .board import Board
+from .generator import SIZE_DIFFICULTIES, Generator
+from .solver import BACKENDS, Solver
+from .stats import SearchStats
+
+CORPUS: dict[int, tuple[str, ...]] = SIZE_DIFFICULTIES
+# The sizes run when none are given; 25x25 and 36x36 take minutes.
+DEFAULT_SIZES: tuple[int, ...] = (6, 9, 16)
+
+# Well-known 9x9 puzzles that are slow for one kind of search or another.
+PATHOLOGICAL: dict[str, str] = {
+    "ai-escargot": (
+        "100007090030020008009600500005300900010080002600004000300000010040000007"
+        "007000300"
+    ),
+    "inkala-2012": (
+        "800000000003600000070090200050007000000045700000100030001000068008500010"
+        "090000400"
+    ),
+    "anti-backtracking": (
+        "000000000000003085001020000000507000004000100090000000500000073002010000"
+        "000040009"
+    ),
+    "golden-nugget": (
+        "000000039000001005003050800008090006070002000100400000009080050020000600"
+        "400700000"
+    ),
+    "platinum-blonde": (
+        "000000012000000003002300400001800005060070800000009000008500000900040500"
+        "470006000"
+    ),
+    "coly013": (
+        "000000007020400060100000500090002040000800600600900000005003000030080020"
+        "700004001"
+    ),
+}
+
+RESULTS_VERSION = 2
+METRICS: tuple[str, ...] = ("median_ms", "p95_ms", "nodes", "peak_kib")
+
+
+class BaselineError(ValueError):
+    pass
+
+
+def corpus_hash(puzzles: list[Board]) -> str:
+    # The solver cases run on puzzles regenerated from the seed, so a change
+    # to the generator changes them; results are only comparable when this
+    # matches.
+    digest = hashlib.sha256()
+    for puzzle in puzzles:
+        digest.update(puzzle.to_line().encode() + b"\n")
+    return digest.hexdigest()
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def timed(work: Callable[[], object], repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def peak_memory(work: Callable[[], object]) -> float:
+    # Run separately from the timings, since tracing slows allocation down.
+    tracemalloc.start()
+    try:
+        work()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(
+    name: str, samples: list[float], nodes: list[int], peak_kib: float, **case
+) -> dict:
+    return {
+        "name": name,
+        **case,
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(percentile(samples, 0.95), 4),
+        "max_ms": round(max(samples), 4),
+        "nodes": sum(nodes),
+        "peak_kib": round(peak_kib, 1),
+    }
+
+
+def generate_puzzle(
+    size: int, difficulty: str, seed: str, stats: SearchStats | None = None
+) -> Board:
+    return Generator(
+        difficulty,
+        size,
+        unique=True,
+        method="transform",
+        stats=stats,
+        rng=random.Random(seed),
+    ).generate_board()
+
+
+def count_nodes(work: Callable[[SearchStats], object]) -> int:
+    # Counted on a separate run so the timings are taken without stats.
+    stats = SearchStats()
+    work(stats)
+    return stats.nodes
+
+
+def bench_generation(
+    size: int, difficulty: str, count: int, seed: int, repeat: int
+) -> tuple[dict, list[Board]]:
+    # Times the generator on the same seeds that make up the solver corpus,
+    # so the puzzles it returns are reproducible from ``seed`` alone.
+    seeds = [f"{seed}-{size}-{difficulty}-{number}" for number in range(count)]
+    puzzles = [generate_puzzle(size, difficulty, board_seed) for board_seed in seeds]
+    samples = []
+    for board_seed in seeds:
+        samples += timed(lambda: generate_puzzle(size, difficulty, board_seed), repeat)
+    peak = max(
+        peak_memory(lambda: generate_puzzle(size, difficulty, board_seed))
+        for board_seed in seeds
+    )
+    nodes = [
+        count_nodes(lambda stats: generate_puzzle(size, difficulty, board_seed, stats))
+        for board_seed in seeds
+    ]
+    result = summarize(
+        f"generate/{size}/{difficulty}",
+        samples,
+        nodes,
+        peak,
+        kind="generate",
+        size=size,
+        difficulty=difficulty,
+        corpus=corpus_hash(puzzles),
+    )
+    return result, puzzles
+
+
+def bench_solving(
+    name: str, puzzles: list[Board], backend: str, repeat: int, **case
+) -> dict:
+    def solve(puzzle: Board, stats: SearchStats | None = None) -> Board:
+        return Solver(puzzle.copy(), puzzle.size, backend, stats=stats).solve_board()
+
+    samples = []
+    for puzzle in puzzles:
+        samples += timed(lambda: solve(puzzle), repeat)
+    peak = max(peak_memory(lambda: solve(puzzle)) for puzzle in puzzles)
+    nodes = [count_nodes(lambda stats: solve(puzzle, stats)) for puzzle in puzzles]
+    return summarize(
+        f"solve/{backend}/{name}",
+        samples,
+        nodes,
+        peak,
+        kind="solve",
+        backend=backend,
+        corpus=corpus_hash(puzzles),
+        **case,
+    )
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    backends: tuple[str, ...] = ("dlx", "propagation"),
+    count: int = 5,
+    repeat: int = 3,
+    seed: int = 0,
+    report: Callable[[dict], None] | None = None,
+) -> dict:
+    # The naive backtracking backend is left out by default: it needs
+    # minutes on the pathological puzzles.
+    cases = []
+
+    def add(result: dict) -> None:
+        cases.append(result)
+        if report is not None:
+            report(result)
+
+    for size in sizes:
+        for difficulty in CORPUS[size]:
+            result, puzzles = bench_generation(size, difficulty, count, seed, repeat)
+            add(result)
+            for backend in backends:
+                add(
+                    bench_solving(
+                        f"{size}/{difficulty}",
+                        puzzles,
+                        backend,
+                        repeat,
+                        size=size,
+                        difficulty=difficulty,
+                    )
+                )
+
+    if 9 in sizes:
+        for puzzle_name, line in PATHOLOGICAL.items():
+            puzzle = Board(9, [int(glyph) for glyph in line])
+            for backend in backends:
+                add(
+                    bench_solving(
+                        f"9/{puzzle_name}",
+                        [puzzle],
+                        backend,
+                        repeat,
+                        size=9,
+                        difficulty="PATHOLOGICAL",
+                        puzzle=puzzle_name,
+                    )
+                )
+
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "seed": seed,
+        "count": count,
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.25) -> list[str]:
+    # Cases that got worse than the baseline by more than ``threshold`` on
+    # any metric. Cases missing from either side are not compared. Raises
+    # BaselineError when the baseline was not run on the same puzzles.
+    for key in ("version", "seed", "count"):
+        if baseline.get(key) != results[key]:
+            raise BaselineError(
+                f"Baseline {key} {baseline.get(key)!r} does not match "
+                f"{results[key]!r}, rerun the baseline"
+            )
+    previous = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old = previous.get(case["name"])
+        if old is None:
+            continue
+        if old.get("corpus") != case["corpus"]:
+            raise BaselineError(
+                f"{case['name']} ran on other puzzles than in the baseline, "
+                "rerun the baseline"
+            )
+        for metric in METRICS:
+            before, after = old.get(metric), case.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold):
+                change = f"+{(after / before - 1):.0%}" if before else "new"
+                regressions.append(
+                    f"{case['name']}: {metric} {before} -> {after} ({change})"
+                )
+    return regressions
+
+
+def format_case(case: dict) -> str:
+    return (
+        f"{case['name']:<40} median {case['median_ms']:>10.3f} ms  "
+        f"p95 {case['p95_ms']:>10.3f} ms  nodes {case['nodes']:>7}  "
+        f"peak {case['peak_kib']:>9.1f} KiB"
+    )
+
+
+def build_parser(parser: argparse.ArgumentParser | None = None):
+    if parser is None:
+        parser = argparse.ArgumentParser(
+            prog="python -m algorithms.benchmark",
+            description="Benchmark the solver and generator without the UI.",
+        )
+    parser.add_argument("--sizes", type=int, nargs="+", choices=sorted(CORPUS))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS)
+    parser.add_argument("--count", type=int, default=5, help="puzzles per case")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per puzzle")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="relative slowdown counted as a regression (default 0.25)",
+    )
+    return parser
+
+
+def run(args: argparse.Namespace) -> int:
+    results = run_benchmarks(
+        sizes=tuple(args.sizes or DEFAULT_SIZES),
+        backends=tuple(args.backends or ("dlx", "propagation")),
+        count=args.count,
+        repeat=args.repeat,
+        seed=args.seed,
+        report=lambda case: print(format_case(case), flush=True),
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    try:
+        regressions = compare(results, baseline, args.threshold)
+    except BaselineError as error:
+        print(error, file=sys.stderr)
+        return 2
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(build_parser().parse_args()))
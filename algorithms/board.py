@@ -0,0 +1,122 @@
+from math import isqrt
+from typing import Iterable, Iterator
+
+# Display glyph for every value, indexed by ``value - 1``. Values are
+# 1..size everywhere inside the algorithms; glyphs only exist at the UI edge.
+SIXTEEN_GLYPHS: tuple[str, ...] = (
+    "1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "A", "B", "C", "D", "E", "F",
+)  # fmt: skip
+
+
+# One character per cell for the single-line puzzle format used by files and
+# pipelines: "." or "0" for an empty cell, then 1-9, A-Z for 10 to 35 and
+# "@" for 36.
+LINE_GLYPHS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ@"
+LINE_EMPTY = ".0"
+
+
+def glyphs(size: int) -> tuple[str, ...]:
+    if size == 16:
+        return SIXTEEN_GLYPHS
+    return tuple(LINE_GLYPHS[:size])
+
+
+def to_glyph(value: int, size: int) -> str:
+    return glyphs(size)[value - 1] if value else ""
+
+
+def from_glyph(glyph: str, size: int) -> int:
+    glyph = glyph.strip().upper()
+    if not glyph:
+        return 0
+    try:
+        return glyphs(size).index(glyph) + 1
+    except ValueError:
+        return -1
+
+
+class Board:
+    # A square board stored as one flat row-major bytearray of values,
+    # 0 for an empty cell.
+    __slots__ = ("size", "cells")
+
+    def __init__(self, size: int, cells: Iterable[int] | None = None) -> None:
+        self.size: int = size
+        self.cells: bytearray = (
+            bytearray(size * size) if cells is None else bytearray(cells)
+        )
+        if len(self.cells) != size * size:
+            raise ValueError(
+                f"A {size}x{size} board needs {size * size} cells, "
+                f"got {len(self.cells)}"
+            )
+
+    @classmethod
+    def from_rows(cls, rows: list[list[int]]) -> "Board":
+        return cls(len(rows), (value for row in rows for value in row))
+
+    @classmethod
+    def from_line(cls, line: str) -> "Board":
+        line = line.strip().upper()
+        size = isqrt(len(line))
+        if not line or size * size != len(line):
+            raise ValueError(
+                f"A puzzle line needs a square number of cells, got {len(line)}"
+            )
+        cells = []
+        for glyph in line:
+            if glyph in LINE_EMPTY:
+                cells.append(0)
+                continue
+            value = LINE_GLYPHS.find(glyph) + 1
+            if not 0 < value <= size:
+                raise ValueError(f"Invalid cell {glyph!r} for a {size}x{size} board")
+            cells.append(value)
+        return cls(size, cells)
+
+    def to_line(self) -> str:
+        return "".join(LINE_GLYPHS[value - 1] if value else "." for value in self.cells)
+
+    def to_rows(self) -> list[list[int]]:
+        size = self.size
+        return [list(self.cells[row * size : row * size + size]) for row in range(size)]
+
+    def copy(self) -> "Board":
+        board = Board.__new__(Board)
+        board.size = self.size
+        board.cells = self.cells[:]
+        return board
+
+    def view(self) -> memoryview:
+        return memoryview(self.cells)
+
+    def row(self, row: int) -> bytearray:
+        return self.cells[row * self.size : row * self.size + self.size]
+
+    def column(self, column: int) -> bytearray:
+        return self.cells[column :: self.size]
+
+    def empty_count(self) -> int:
+        return self.cells.count(0)
+
+    def __getitem__(self, position: tuple[int, int]) -> int:
+        row, column = position
+        return self.cells[row * self.size + column]
+
+    def __setitem__(self, position: tuple[int, int], value: int) -> None:
+        row, column = position
+        self.cells[row * self.size + column] = value
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.cells)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.size == other.size and self.cells == other.cells
+
+    def __repr__(self) -> str:
+        return f"Board({self.size}, {bytes(self.cells)!r})"
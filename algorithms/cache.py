@@ -0,0 +1,98 @@
+import dbm
+import threading
+from collections import OrderedDict
+from threading import Event
+
+from .board import Board
+from .solver import Solver
+from .transforms import Transform, canonical_transform
+
+
+class SolutionCache:
+    # Solutions keyed by the canonical form of their puzzle, so a puzzle
+    # that is only relabeled, reordered or transposed from a cached one is
+    # a lookup. Up to ``capacity`` recent entries are kept in memory; with a
+    # ``path``, every entry is also written to a dbm file and survives
+    # restarts. Safe to share between threads.
+    def __init__(self, capacity: int = 256, path: str | None = None) -> None:
+        if capacity < 1:
+            raise ValueError("The cache capacity must be at least 1")
+        self.capacity: int = capacity
+        self.entries: OrderedDict[bytes, bytes] = OrderedDict()
+        self.lock = threading.Lock()
+        self.database = None if path is None else dbm.open(path, "c")
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def close(self) -> None:
+        with self.lock:
+            if self.database is not None:
+                self.database.close()
+                self.database = None
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def canonical_key(self, puzzle: Board) -> tuple[Transform, bytes]:
+        transform = canonical_transform(puzzle.cells, puzzle.size)
+        return transform, bytes([puzzle.size]) + bytes(transform.apply(puzzle.cells))
+
+    def remember(self, key: bytes, solution: bytes) -> None:
+        # Called with the lock held.
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def find(self, key: bytes) -> bytes | None:
+        with self.lock:
+            solution = self.entries.get(key)
+            if solution is not None:
+                self.entries.move_to_end(key)
+            elif self.database is not None and key in self.database:
+                solution = self.database[key]
+                self.remember(key, solution)
+            if solution is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return solution
+
+    def lookup(self, puzzle: Board) -> Board | None:
+        transform, key = self.canonical_key(puzzle)
+        solution = self.find(key)
+        if solution is None:
+            return None
+        return Board(puzzle.size, transform.invert(solution))
+
+    def add(self, key: bytes, solution: bytes) -> None:
+        with self.lock:
+            self.remember(key, solution)
+            if self.database is not None:
+                self.database[key] = solution
+
+    def store(self, puzzle: Board, solution: Board) -> None:
+        transform, key = self.canonical_key(puzzle)
+        self.add(key, bytes(transform.apply(solution.cells)))
+
+    def solve(
+        self,
+        puzzle: Board,
+        backend: str = "propagation",
+        cancel_event: Event | None = None,
+    ) -> Board | None:
+        # The cached solution of ``puzzle``, solving and caching it first on
+        # a miss. Returns None when the puzzle has no solution.
+        transform, key = self.canonical_key(puzzle)
+        solution = self.find(key)
+        if solution is None:
+            canonical = Board(puzzle.size, key[1:])
+            solved = Solver(canonical, puzzle.size, backend, cancel_event).solve_board()
+            if 0 in solved.cells:
+                return None
+            solution = bytes(solved.cells)
+            self.add(key, solution)
+        return Board(puzzle.size, transform.invert(solution))
@@ -0,0 +1,62 @@
+from typing import Iterator
+
+from .geometry import geometry
+
+
+def subgrid_shape(size: int) -> tuple[int, int]:
+    shape = geometry(size)
+    return shape.box_rows, shape.box_cols
+
+
+def iter_values(mask: int) -> Iterator[int]:
+    while mask:
+        lowest_bit = mask & -mask
+        yield lowest_bit.bit_length()
+        mask ^= lowest_bit
+
+
+class ConstraintState:
+    # Value ``v`` (1..size) occupies bit ``v - 1`` of each mask.
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.full_mask: int = (1 << size) - 1
+        self.geometry = geometry(size)
+        self.subgrid_rows: int = self.geometry.box_rows
+        self.subgrid_cols: int = self.geometry.box_cols
+        self.box_of: tuple[int, ...] = self.geometry.box_of
+        self.rows: list[int] = [0] * size
+        self.columns: list[int] = [0] * size
+        self.subgrids: list[int] = [0] * size
+
+    def subgrid_index(self, row: int, column: int) -> int:
+        return self.box_of[row * self.size + column]
+
+    def place(self, value: int, row: int, column: int) -> None:
+        bit = 1 << (value - 1)
+        self.rows[row] |= bit
+        self.columns[column] |= bit
+        self.subgrids[self.subgrid_index(row, column)] |= bit
+
+    def unplace(self, value: int, row: int, column: int) -> None:
+        mask = ~(1 << (value - 1))
+        self.rows[row] &= mask
+        self.columns[column] &= mask
+        self.subgrids[self.subgrid_index(row, column)] &= mask
+
+    def is_valid(self, value: int, row: int, column: int) -> bool:
+        return not (
+            (
+                self.rows[row]
+                | self.columns[column]
+                | self.subgrids[self.subgrid_index(row, column)]
+            )
+            >> (value - 1)
+            & 1
+        )
+
+    def candidates(self, row: int, column: int) -> int:
+        return ~(
+            self.rows[row]
+            | self.columns[column]
+            | self.subgrids[self.subgrid_index(row, column)]
+        ) & self.full_mask
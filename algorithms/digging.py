@@ -0,0 +1,167 @@
+import random
+from threading import Event
+
+from .errors import SearchCancelled
+from .geometry import geometry
+from .propagation import Propagator
+from .stats import SearchStats
+from .tasks import Steps, run_steps
+
+# Clue patterns a puzzle can be dug in: every cleared cell is cleared with
+# its image under the symmetry, so the givens keep it.
+SYMMETRIES: tuple[str, ...] = ("none", "rotational", "mirror", "diagonal")
+
+
+def symmetric_cell(index: int, size: int, symmetry: str) -> int:
+    row, column = divmod(index, size)
+    if symmetry == "rotational":
+        return (size - 1 - row) * size + size - 1 - column
+    if symmetry == "mirror":
+        return row * size + size - 1 - column
+    if symmetry == "diagonal":
+        return column * size + row
+    return index
+
+
+def cell_orbits(size: int, symmetry: str) -> list[tuple[int, ...]]:
+    # The groups of cells cleared together, every cell in exactly one.
+    orbits, seen = [], set()
+    for index in range(size * size):
+        if index not in seen:
+            orbit = tuple(sorted({index, symmetric_cell(index, size, symmetry)}))
+            seen.update(orbit)
+            orbits.append(orbit)
+    return orbits
+
+
+class Digger:
+    # Clears clues from a solved grid in a single pass over its cells in a
+    # random order, keeping each removal only if the solution stays unique.
+    # The values of every unit are kept as masks between removals, so a
+    # test starts the propagator from them instead of reloading the
+    # givens, and a cleared cell its peers still force needs no search.
+    # Without a limit the pass ends at a minimal puzzle: a clue that had to
+    # stay keeps having to once more clues are gone.
+    def __init__(
+        self,
+        solution: list[int],
+        size: int,
+        symmetry: str = "none",
+        cancel_event: Event | None = None,
+        stats: SearchStats | None = None,
+        rng: random.Random | None = None,
+        max_guesses: int | None = None,
+    ) -> None:
+        if symmetry not in SYMMETRIES:
+            raise ValueError(
+                f"Unknown symmetry {symmetry!r}, expected one of {SYMMETRIES}"
+            )
+        self.size: int = size
+        self.cancel_event: Event | None = cancel_event
+        self.cell_units = geometry(size).cell_units
+        self.full_mask: int = (1 << size) - 1
+        self.solution: list[int] = list(solution)
+        self.values: list[int] = list(solution)
+        self.used: list[int] = [self.full_mask] * (3 * size)
+        self.propagator = Propagator(size, cancel_event, stats)
+        # A uniqueness test that needs more guesses than this is given up
+        # and its clues kept: the puzzle stays unique, but may not be minimal.
+        self.max_guesses: int | None = max_guesses
+        self.orbits: list[tuple[int, ...]] = cell_orbits(size, symmetry)
+        (rng or random).shuffle(self.orbits)
+        # The next orbit to try; digging again resumes from here.
+        self.position: int = 0
+
+    def clear(self, index: int) -> None:
+        mask = ~(1 << (self.values[index] - 1))
+        for unit in self.cell_units[index]:
+            self.used[unit] &= mask
+        self.values[index] = 0
+
+    def restore(self, index: int) -> None:
+        value = self.values[index] = self.solution[index]
+        for unit in self.cell_units[index]:
+            self.used[unit] |= 1 << (value - 1)
+
+    def candidates(self, index: int) -> int:
+        if self.values[index]:
+            return 1 << (self.values[index] - 1)
+        row, column, box = self.cell_units[index]
+        return self.full_mask & ~(self.used[row] | self.used[column] | self.used[box])
+
+    def dig(self, limit: int | None = None) -> int:
+        return run_steps(self.dig_steps(limit))
+
+    def exhausted(self) -> bool:
+        return self.position == len(self.orbits)
+
+    def dig_steps(self, limit: int | None = None) -> Steps:
+        # Clears up to ``limit`` more clues, all that can go when None, and
+        # returns how many were cleared. The puzzle is left in ``values``.
+        removed = 0
+        while not self.exhausted():
+            orbit = self.orbits[self.position]
+            if limit is not None and removed + len(orbit) > limit:
+                break
+            if (yield from self.dig_next_steps()):
+                removed += len(orbit)
+            yield
+        return removed
+
+    def dig_next_steps(self) -> Steps:
+        # Tries the next orbit and returns whether its clues were cleared.
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelled
+        orbit = self.orbits[self.position]
+        self.position += 1
+        for index in orbit:
+            self.clear(index)
+        if (yield from self.unique_steps(orbit)):
+            return True
+        for index in orbit:
+            self.restore(index)
+        return False
+
+    def put_back(self) -> None:
+        # Restores the clues of the last orbit tried. Adding clues back never
+        # breaks uniqueness.
+        for index in self.orbits[self.position - 1]:
+            if not self.values[index]:
+                self.restore(index)
+
+    def rewind(self, position: int) -> None:
+        # Restores the clues of every orbit tried since ``position`` and
+        # digs from there again next time.
+        for orbit in self.orbits[position : self.position]:
+            for index in orbit:
+                if not self.values[index]:
+                    self.restore(index)
+        self.position = position
+
+    def unique_steps(self, orbit: tuple[int, ...]) -> Steps:
+        # The puzzle was unique before ``orbit`` was cleared, so any other
+        # solution now differs from the known one inside the orbit.
+        for index in orbit:
+            value = self.solution[index]
+            if self.candidates(index) == 1 << (value - 1):
+                continue
+            if (yield from self.other_solution_steps(index, value)):
+                return False
+        return True
+
+    def other_solution_steps(self, index: int, value: int) -> Steps:
+        propagator = self.propagator
+        propagator.reset(
+            self.values, [self.candidates(cell) for cell in range(len(self.values))]
+        )
+        if not propagator.exclude(index, value) or not propagator.propagate():
+            return False
+        guesses = 0
+        for solution in propagator.walk():
+            if solution is not None:
+                return True
+            guesses += 1
+            if self.max_guesses is not None and guesses > self.max_guesses:
+                return True
+            yield
+        return False
@@ -0,0 +1,190 @@
+from threading import Event
+from typing import Iterator
+
+from .constraints import ConstraintState, iter_values
+from .errors import SearchCancelled
+from .stats import SearchStats
+
+
+class DancingLinks:
+    # Node 0 is the root and nodes 1..column_count are the column headers;
+    # row nodes are appended after them. Links are stored in parallel lists,
+    # and every row node carries the (cell index, value) choice of its row.
+    def __init__(self, column_count: int) -> None:
+        headers = column_count + 1
+        self.left: list[int] = [i - 1 for i in range(headers)]
+        self.right: list[int] = [i + 1 for i in range(headers)]
+        self.left[0] = column_count
+        self.right[column_count] = 0
+        self.up: list[int] = list(range(headers))
+        self.down: list[int] = list(range(headers))
+        self.column: list[int] = list(range(headers))
+        self.row_id: list[tuple[int, int] | None] = [None] * headers
+        self.sizes: list[int] = [0] * headers
+
+    def exclude_column(self, column: int) -> None:
+        header = column + 1
+        self.right[self.left[header]] = self.right[header]
+        self.left[self.right[header]] = self.left[header]
+
+    def add_row(self, row_id: tuple[int, int], columns: list[int]) -> None:
+        first = len(self.left)
+        last = first + len(columns) - 1
+        for node, column in enumerate(columns, start=first):
+            header = column + 1
+            self.left.append(node - 1 if node > first else last)
+            self.right.append(node + 1 if node < last else first)
+            self.up.append(self.up[header])
+            self.down.append(header)
+            self.down[self.up[header]] = node
+            self.up[header] = node
+            self.column.append(header)
+            self.row_id.append(row_id)
+            self.sizes[header] += 1
+
+    def cover(self, header: int) -> None:
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, sizes = self.column, self.sizes
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                sizes[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header: int) -> None:
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, sizes = self.column, self.sizes
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                sizes[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def choose_column(self) -> int:
+        right, sizes = self.right, self.sizes
+        best, best_size = 0, -1
+        header = right[0]
+        while header != 0:
+            if best_size < 0 or sizes[header] < best_size:
+                best, best_size = header, sizes[header]
+                if best_size <= 1:
+                    break
+            header = right[header]
+        return best
+
+    def search(
+        self, cancel_event: Event | None = None, stats: SearchStats | None = None
+    ) -> Iterator[list[tuple[int, int]]]:
+        right, left, down = self.right, self.left, self.down
+        column, row_id = self.column, self.row_id
+        chosen: list[int] = []
+
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise SearchCancelled
+            if right[0] == 0:
+                yield [row_id[node] for node in chosen]
+                node = None
+            else:
+                header = self.choose_column()
+                if stats is not None:
+                    stats.test(self.sizes[header])
+                self.cover(header)
+                node = down[header]
+                if node == header:
+                    self.uncover(header)
+                    node = None
+
+            # Backtrack until a row with an untried sibling is found.
+            while node is None:
+                if not chosen:
+                    return
+                previous = chosen.pop()
+                if stats is not None:
+                    stats.unplace(*row_id[previous], len(chosen) + 1)
+                j = left[previous]
+                while j != previous:
+                    self.uncover(column[j])
+                    j = left[j]
+                header = column[previous]
+                node = down[previous]
+                if node == header:
+                    self.uncover(header)
+                    node = None
+
+            chosen.append(node)
+            if stats is not None:
+                stats.place(*row_id[node], len(chosen))
+            j = right[node]
+            while j != node:
+                self.cover(column[j])
+                j = right[j]
+
+
+def build_links(grid: list[int], size: int) -> DancingLinks | None:
+    # The exact cover matrix of ``grid``, or None when its givens clash.
+    cells = size * size
+    constraints = ConstraintState(size)
+    for index, value in enumerate(grid):
+        if value:
+            if not constraints.is_valid(value, *divmod(index, size)):
+                return None
+            constraints.place(value, *divmod(index, size))
+
+    links = DancingLinks(4 * cells)
+    for index, value in enumerate(grid):
+        row, column = divmod(index, size)
+        subgrid = constraints.subgrid_index(row, column)
+        if value:
+            links.exclude_column(index)
+            continue
+        for candidate in iter_values(constraints.candidates(row, column)):
+            links.add_row(
+                (index, candidate),
+                [
+                    index,
+                    cells + row * size + candidate - 1,
+                    2 * cells + column * size + candidate - 1,
+                    3 * cells + subgrid * size + candidate - 1,
+                ],
+            )
+    for row in range(size):
+        for value in iter_values(constraints.rows[row]):
+            links.exclude_column(cells + row * size + value - 1)
+    for column in range(size):
+        for value in iter_values(constraints.columns[column]):
+            links.exclude_column(2 * cells + column * size + value - 1)
+    for subgrid in range(size):
+        for value in iter_values(constraints.subgrids[subgrid]):
+            links.exclude_column(3 * cells + subgrid * size + value - 1)
+    return links
+
+
+def solve_grid(
+    grid: list[int],
+    size: int,
+    cancel_event: Event | None = None,
+    stats: SearchStats | None = None,
+) -> Iterator[list[int]]:
+    # ``grid`` is a flat row-major list of values, 0 for an empty cell.
+    # Yields every completion of it as a new flat list.
+    links = build_links(grid, size)
+    if links is None:
+        return
+    for rows in links.search(cancel_event, stats):
+        solution = list(grid)
+        for index, value in rows:
+            solution[index] = value
+        yield solution
@@ -0,0 +1,2 @@
+class SearchCancelled(Exception):
+    pass
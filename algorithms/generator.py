@@ -1,120 +1,341 @@
-from math import sqrt, floor
+from contextlib import nullcontext
 import random
+import time
+from threading import Event
+
+from .backtracking import Backtracker
+from .board import Board
+from .constraints import ConstraintState
+from .digging import SYMMETRIES, Digger, cell_orbits
+from .grader import Grade, Grader, band_distance, band_offset
+from .propagation import Propagator
+from .stats import SearchStats
+from .tasks import Steps, run_steps
+from .transforms import random_solved_grid
+
+FILL_METHODS: tuple[str, ...] = ("backtracking", "propagation", "transform")
+# The difficulties generate_board has clue counts for, by board size.
+SIZE_DIFFICULTIES: dict[int, tuple[str, ...]] = {
+    6: ("EASY", "MEDIUM", "HARD", "EXPERT"),
+    8: ("EASY", "MEDIUM", "HARD", "EXPERT"),
+    9: ("EASY", "MEDIUM", "HARD", "EXPERT"),
+    12: ("EASY", "MEDIUM", "HARD", "EXPERT"),
+    16: ("MEDIUM", "HARD", "EXPERT"),
+    25: ("MEDIUM", "HARD", "EXPERT"),
+    36: ("MEDIUM", "HARD", "EXPERT"),
+}
+# Graded digging goes past the clue range of a difficulty when it has to,
+# where a single uniqueness test can take seconds on large boards. Tests are
+# given up after this many guesses per cell of the board instead, as a guess
+# costs about a propagation over every cell.
+GRADED_GUESS_BUDGET = 65536
+# How many clues to remove from a full board, as an inclusive range.
+CLUE_REMOVALS: dict[str, dict[int, tuple[int, int]]] = {
+    "EASY": {6: (9, 12), 9: (20, 27)},
+    "MEDIUM": {6: (12, 15), 9: (28, 37), 16: (58, 77)},
+    "HARD": {6: (15, 18), 9: (38, 47), 16: (78, 97)},
+    "EXPERT": {6: (22, 25), 9: (48, 57), 16: (98, 117)},
+}
+
+
+def removal_range(size: int, difficulty: str) -> tuple[int, int]:
+    # Sizes without their own range scale the 9x9 one up to 12x12, and the
+    # 16x16 one beyond that, by the number of cells.
+    removals = CLUE_REMOVALS[difficulty]
+    if size in removals:
+        return removals[size]
+    reference = 9 if size <= 12 else 16
+    low, high = removals[reference]
+    scale = (size * size) / (reference * reference)
+    return round(low * scale), round(high * scale)
 
 
 class Generator:
-    def __init__(self, difficulty: str, size: int = 9) -> None:
+    def __init__(
+        self,
+        difficulty: str,
+        size: int = 9,
+        unique: bool = False,
+        method: str = "backtracking",
+        cancel_event: Event | None = None,
+        graded: bool = False,
+        max_attempts: int = 20,
+        stats: SearchStats | None = None,
+        symmetry: str = "none",
+        minimal: bool = False,
+        rng: random.Random | None = None,
+        time_limit: float | None = None,
+    ) -> None:
+        if method not in FILL_METHODS:
+            raise ValueError(
+                f"Unknown fill method {method!r}, expected one of {FILL_METHODS}"
+            )
+        if symmetry not in SYMMETRIES:
+            raise ValueError(
+                f"Unknown symmetry {symmetry!r}, expected one of {SYMMETRIES}"
+            )
+        if difficulty.upper() not in SIZE_DIFFICULTIES.get(size, ()):
+            raise ValueError(f"No {difficulty} puzzles for a {size}x{size} board")
         self.difficulty: str = difficulty
         self.size: int = size
-        self.board: list[list[int | str]] = [
-            [0 for _ in range(self.size)] for _ in range(self.size)
-        ]
-        self.number_to_char = {
-            10: "10",
-            11: "A",
-            12: "B",
-            13: "C",
-            14: "D",
-            15: "E",
-            16: "F",
-        }
-        self.char_to_number: dict[str, int] = {
-            v: k for k, v in self.number_to_char.items()
-        }
-
-    def is_number_in_row(self, number: int | str, row: int) -> bool:
-        return number in self.board[row]
-
-    def is_number_in_column(self, number: int | str, column: int) -> bool:
+        self.unique: bool = unique
+        self.method: str = method
+        self.cancel_event: Event | None = cancel_event
+        self.graded: bool = graded
+        self.max_attempts: int = max_attempts
+        # Seconds graded generation may take before it settles for the
+        # closest board found so far; None for no limit beyond max_attempts.
+        self.time_limit: float | None = time_limit
+        self.stats: SearchStats | None = stats
+        self.symmetry: str = symmetry
+        # Dig every clue that can go, ignoring the clue count of the
+        # difficulty; implies unique.
+        self.minimal: bool = minimal
+        # Every random choice is drawn from ``rng``, so a board can be
+        # reproduced from its seed whatever else uses ``random``; the
+        # module-level generator when None.
+        self.rng = rng or random
+        self.grade: Grade | None = None
+        # Whether a graded board landed in the requested band; None when
+        # not graded. Out of band, the board is the closest one found.
+        self.in_band: bool | None = None
+        # The filled grid the board was dug from, one of its solutions.
+        self.solution: Board | None = None
+        self.board: Board = Board(self.size)
+        self.constraints = ConstraintState(self.size)
+        for index, value in enumerate(self.board.cells):
+            if value:
+                self.constraints.place(value, *divmod(index, self.size))
+
+    def reset_board(self) -> None:
+        self.board = Board(self.size)
+        self.constraints = ConstraintState(self.size)
+
+    def is_number_in_row(self, number: int, row: int) -> bool:
+        return number in self.board.row(row)
+
+    def is_number_in_column(self, number: int, column: int) -> bool:
         for i in range(self.size):
-            if self.board[i][column] == number:
+            if self.board[i, column] == number:
                 return True
         return False
 
-    def is_number_in_subgrid(self, number: int | str, row: int, column: int) -> bool:
-        if self.size == 6:
-            subgrid_row_start = (row // 2) * 2
-            subgrid_col_start = (column // 3) * 3
-            subgrid_row_end = subgrid_row_start + 1
-            subgrid_col_end = subgrid_col_start + 2
-
-            for row in range(subgrid_row_start, subgrid_row_end + 1):
-                for column in range(subgrid_col_start, subgrid_col_end + 1):
-                    if self.board[row][column] == number:
-                        return True
-            return False
-        else:
-            subgrid_size = floor(sqrt(self.size))
-            subgrid_row_size, subgrid_col_size = subgrid_size, subgrid_size
+    def is_number_in_subgrid(self, number: int, row: int, column: int) -> bool:
+        cells = self.board.cells
+        return any(
+            cells[index] == number
+            for index in self.constraints.geometry.box_cells(row, column)
+        )
 
-            subgrid_row = row - row % subgrid_row_size
-            subgrid_column = column - column % subgrid_col_size
+    def is_valid_position(self, number: int, row: int, column: int) -> bool:
+        return self.constraints.is_valid(number, row, column)
 
-            for row in range(subgrid_row, subgrid_row + subgrid_size):
-                for column in range(subgrid_column, subgrid_column + subgrid_size):
-                    if self.board[row][column] == number:
-                        return True
-            return False
+    def place_number(self, value: int, row: int, column: int) -> None:
+        self.board[row, column] = value
+        self.constraints.place(value, row, column)
 
-    def is_valid_position(self, number: int | str, row: int, column: int) -> bool:
-        return (
-            not self.is_number_in_row(number=number, row=row)
-            and not self.is_number_in_column(number=number, column=column)
-            and not self.is_number_in_subgrid(number=number, row=row, column=column)
-        )
+    def remove_number(self, value: int, row: int, column: int) -> None:
+        self.board[row, column] = 0
+        self.constraints.unplace(value, row, column)
 
     def populate_numbers_in_board(self) -> bool:
-        for row in range(self.size):
-            for column in range(self.size):
-                if self.board[row][column] == 0:
-                    numbers = (
-                        list(range(1, 10)) + list(self.number_to_char.values())
-                        if self.size == 16
-                        else list(range(1, self.size + 1))
-                    )
-                    random.shuffle(numbers)
-                    for number in numbers:
-                        if self.is_valid_position(
-                            number=number, row=row, column=column
-                        ):
-                            self.board[row][column] = number
-                            if self.populate_numbers_in_board():
-                                return True
-                            self.board[row][column] = 0
-                    return False
+        return run_steps(self.backtracking_steps())
+
+    def backtracking_steps(self) -> Steps:
+        # Random depth-first fill.
+        return Backtracker(
+            self.board,
+            self.constraints,
+            self.cancel_event,
+            self.stats,
+            shuffle=True,
+            rng=self.rng,
+        ).steps()
+
+    def populate_numbers_with_propagation(self) -> bool:
+        return run_steps(self.propagation_steps())
+
+    def propagation_steps(self) -> Steps:
+        # Random fill with the propagation search, which stays fast on the
+        # 25x25 and larger boards where plain backtracking thrashes.
+        propagator = Propagator(
+            self.size, self.cancel_event, self.stats, shuffle=True, rng=self.rng
+        )
+        if not propagator.load(self.get_values()):
+            return False
+        for solution in propagator.walk():
+            if solution is not None:
+                break
+            yield
+        else:
+            return False
+        for index, value in enumerate(solution):
+            row, column = divmod(index, self.size)
+            if self.board[row, column] == 0:
+                self.place_number(value, row, column)
+        return True
+
+    def populate_numbers_from_transforms(self) -> bool:
+        for index, value in enumerate(random_solved_grid(self.size, self.rng)):
+            row, column = divmod(index, self.size)
+            if self.board[row, column] == 0:
+                self.place_number(value, row, column)
         return True
 
     def remove_numbers_at_random_positions(self, limit: int) -> None:
-        while limit > 0:
-            row: int = random.randint(0, self.size - 1)
-            column: int = random.randint(0, self.size - 1)
-            if self.board[row][column] != 0:
-                self.board[row][column] = 0
-                limit -= 1
-
-    def generate_board(self) -> list[list[int | str]]:
-        limit: dict[str, dict[int, int]] = {
-            "EASY": {6: random.randint(9, 12), 9: random.randint(20, 27)},
-            "MEDIUM": {
-                6: random.randint(12, 15),
-                9: random.randint(28, 37),
-                16: random.randint(58, 77),
-            },
-            "HARD": {
-                6: random.randint(15, 18),
-                9: random.randint(38, 47),
-                16: random.randint(78, 97),
-            },
-            "EXPERT": {
-                6: random.randint(22, 25),
-                9: random.randint(48, 57),
-                16: random.randint(98, 117),
-            },
-        }
-
-        self.populate_numbers_in_board()
-
-        self.remove_numbers_at_random_positions(
-            limit=limit[self.difficulty.upper()][self.size]
+        # One shuffled pass over the cells, so a cleared cell is never
+        # picked again.
+        orbits = cell_orbits(self.size, self.symmetry)
+        self.rng.shuffle(orbits)
+        for orbit in orbits:
+            if limit <= 0:
+                break
+            if len(orbit) > limit:
+                continue
+            for index in orbit:
+                row, column = divmod(index, self.size)
+                if self.board[row, column]:
+                    self.remove_number(self.board[row, column], row, column)
+            limit -= len(orbit)
+
+    def get_values(self) -> list[int]:
+        return list(self.board.cells)
+
+    def remove_numbers_keeping_unique_solution(self, limit: int) -> None:
+        run_steps(self.removal_steps(limit))
+
+    def removal_steps(self, limit: int) -> Steps:
+        digger = Digger(
+            self.get_values(),
+            self.size,
+            self.symmetry,
+            self.cancel_event,
+            self.stats,
+            self.rng,
+        )
+        yield from digger.dig_steps(None if self.minimal else limit)
+        self.clear_dug_cells(digger.values)
+
+    def graded_removal_steps(self, difficulty: str, deadline: float | None) -> Steps:
+        # Digs to a clue count short of the range of ``difficulty``, then on
+        # in batches, grading after each, until the grader puts the puzzle in
+        # its band. A batch that jumps past the band is undone and dug again
+        # in halves, down to single clues, which are put back and the next
+        # one tried. Stops at ``deadline``, a perf_counter time. Returns the
+        # grade of the dug puzzle.
+        digger = Digger(
+            self.get_values(),
+            self.size,
+            self.symmetry,
+            self.cancel_event,
+            self.stats,
+            self.rng,
+            max_guesses=GRADED_GUESS_BUDGET // (self.size * self.size),
         )
+        low, high = removal_range(self.size, difficulty)
+        if difficulty == "EASY":
+            yield from digger.dig_steps(self.rng.randint(low, high))
+        else:
+            yield from digger.dig_steps(max(0, 2 * low - high - 1))
+        batch = max(1, (high - low + 1) // 2)
+        grade = yield from self.grade_steps(digger.values)
+        while band_offset(grade, difficulty) < 0 and not digger.exhausted():
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            position = digger.position
+            removed = yield from digger.dig_steps(batch)
+            if digger.position == position:
+                # The next orbit holds more clues than the batch.
+                removed = yield from digger.dig_next_steps()
+            if not removed:
+                continue
+            dug = yield from self.grade_steps(digger.values)
+            if band_offset(dug, difficulty) <= 0:
+                grade = dug
+            elif batch > 1:
+                digger.rewind(position)
+                batch //= 2
+            else:
+                digger.put_back()
+            yield
+        self.clear_dug_cells(digger.values)
+        return grade
+
+    def grade_steps(self, values: list[int]) -> Steps:
+        grader = Grader(Board(self.size, values))
+        return (yield from self.phase_steps("grading", grader.grade_steps()))
+
+    def clear_dug_cells(self, values: list[int]) -> None:
+        for index, value in enumerate(values):
+            row, column = divmod(index, self.size)
+            if not value and self.board[row, column]:
+                self.remove_number(self.board[row, column], row, column)
+
+    def generate_board(self) -> Board:
+        return run_steps(self.steps())
+
+    def steps(self) -> Steps:
+        # generate_board as steps, see tasks.Task.
+        difficulty = self.difficulty.upper()
+        if not self.graded:
+            return (
+                yield from self.candidate_steps(
+                    self.rng.randint(*removal_range(self.size, difficulty))
+                )
+            )
+
+        # Keep generating until a candidate lands in the requested band,
+        # falling back to the closest one after ``max_attempts`` or
+        # ``time_limit``; in_band tells the two apart. ``minimal`` does not
+        # apply here: the band, not the clue count, decides how deep a
+        # candidate is dug.
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+        best: tuple[int, Board, Board, Grade] | None = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                self.reset_board()
+            yield from self.fill_steps()
+            grade = yield from self.phase_steps(
+                "removal", self.graded_removal_steps(difficulty, deadline)
+            )
+            distance = band_distance(grade, difficulty)
+            if best is None or distance < best[0]:
+                best = (distance, self.board, self.solution, grade)
+            if distance == 0:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            yield
+        distance, self.board, self.solution, self.grade = best
+        self.in_band = distance == 0
+        return self.board
+
+    def phase(self, name: str):
+        return nullcontext() if self.stats is None else self.stats.phase(name)
+
+    def phase_steps(self, name: str, steps: Steps) -> Steps:
+        return steps if self.stats is None else self.stats.phase_steps(name, steps)
+
+    def generate_candidate(self, limit: int) -> Board:
+        return run_steps(self.candidate_steps(limit))
+
+    def fill_steps(self) -> Steps:
+        if self.method == "transform":
+            with self.phase("fill"):
+                self.populate_numbers_from_transforms()
+        elif self.method == "propagation":
+            yield from self.phase_steps("fill", self.propagation_steps())
+        else:
+            yield from self.phase_steps("fill", self.backtracking_steps())
+        self.solution = self.board.copy()
+
+    def candidate_steps(self, limit: int) -> Steps:
+        yield from self.fill_steps()
+        if self.unique or self.minimal:
+            yield from self.phase_steps("removal", self.removal_steps(limit))
+        else:
+            with self.phase("removal"):
+                self.remove_numbers_at_random_positions(limit=limit)
         return self.board
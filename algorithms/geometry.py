@@ -0,0 +1,78 @@
+from functools import lru_cache
+from math import isqrt
+
+
+def box_shape(size: int) -> tuple[int, int]:
+    # The squarest rows x columns split of ``size`` with rows <= columns:
+    # 6 is 2x3, 8 is 2x4, 12 is 3x4, 9, 16, 25 and 36 are square.
+    for box_rows in range(isqrt(size), 1, -1):
+        if size % box_rows == 0:
+            return box_rows, size // box_rows
+    raise ValueError(f"A {size}x{size} board cannot be split into boxes")
+
+
+class Geometry:
+    # Everything about a board that depends only on its size: the box shape
+    # and flat lookup tables of the units and peers of every cell, so hot
+    # loops index lists instead of recomputing divisions. Use geometry()
+    # to get the shared instance for a size.
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.cell_count: int = size * size
+        self.box_rows, self.box_cols = box_shape(size)
+        self.boxes_per_row: int = size // self.box_cols
+
+        self.row_of: tuple[int, ...] = tuple(
+            index // size for index in range(self.cell_count)
+        )
+        self.column_of: tuple[int, ...] = tuple(
+            index % size for index in range(self.cell_count)
+        )
+        self.box_of: tuple[int, ...] = tuple(
+            self.box_index(index // size, index % size)
+            for index in range(self.cell_count)
+        )
+
+        rows = [[] for _ in range(size)]
+        columns = [[] for _ in range(size)]
+        boxes = [[] for _ in range(size)]
+        for index in range(self.cell_count):
+            rows[self.row_of[index]].append(index)
+            columns[self.column_of[index]].append(index)
+            boxes[self.box_of[index]].append(index)
+        # Units are the rows 0..size-1, then the columns, then the boxes.
+        self.units: tuple[tuple[int, ...], ...] = tuple(
+            tuple(unit) for unit in rows + columns + boxes
+        )
+        self.cell_units: tuple[tuple[int, int, int], ...] = tuple(
+            (
+                self.row_of[index],
+                size + self.column_of[index],
+                2 * size + self.box_of[index],
+            )
+            for index in range(self.cell_count)
+        )
+        self.peers: tuple[tuple[int, ...], ...] = tuple(
+            tuple(
+                sorted(
+                    (
+                        set(rows[self.row_of[index]])
+                        | set(columns[self.column_of[index]])
+                        | set(boxes[self.box_of[index]])
+                    )
+                    - {index}
+                )
+            )
+            for index in range(self.cell_count)
+        )
+
+    def box_index(self, row: int, column: int) -> int:
+        return (row // self.box_rows) * self.boxes_per_row + column // self.box_cols
+
+    def box_cells(self, row: int, column: int) -> tuple[int, ...]:
+        return self.units[2 * self.size + self.box_index(row, column)]
+
+
+@lru_cache(maxsize=None)
+def geometry(size: int) -> Geometry:
+    return Geometry(size)
@@ -0,0 +1,299 @@
+from itertools import combinations
+from typing import Callable, NamedTuple
+
+from .board import Board
+from .constraints import iter_values
+from .geometry import geometry
+from .propagation import Propagator
+from .tasks import Steps, run_steps
+
+# Techniques in the order a human would reach for them, with the score each
+# application adds. The last entry is the fallback when none of them apply.
+TECHNIQUES: tuple[tuple[str, int], ...] = (
+    ("naked single", 1),
+    ("hidden single", 2),
+    ("pointing", 5),
+    ("claiming", 5),
+    ("naked pair", 8),
+    ("hidden pair", 10),
+    ("naked triple", 12),
+    ("hidden triple", 15),
+    ("x-wing", 20),
+    ("search", 50),
+)
+TECHNIQUE_COSTS: dict[str, int] = dict(TECHNIQUES)
+TECHNIQUE_LEVELS: dict[str, int] = {
+    name: level for level, (name, _) in enumerate(TECHNIQUES)
+}
+
+# The hardest technique a puzzle may need to be graded at each difficulty.
+# Most minimal puzzles need nothing past singles, so the single techniques
+# split the two lower bands between them and HARD starts at the first
+# elimination technique; a band reaching any higher is rarely hit.
+DIFFICULTY_CEILINGS: dict[str, str] = {
+    "EASY": "naked single",
+    "MEDIUM": "hidden single",
+    "HARD": "x-wing",
+    "EXPERT": "search",
+}
+
+
+class Grade(NamedTuple):
+    score: int
+    hardest: str
+    steps: dict[str, int]
+
+
+def difficulty_of(grade: Grade) -> str:
+    level = TECHNIQUE_LEVELS[grade.hardest]
+    for difficulty, ceiling in DIFFICULTY_CEILINGS.items():
+        if level <= TECHNIQUE_LEVELS[ceiling]:
+            return difficulty
+    return "EXPERT"
+
+
+def band_offset(grade: Grade, difficulty: str) -> int:
+    # How many difficulty bands ``grade`` is above ``difficulty``, negative
+    # when it is easier.
+    bands = list(DIFFICULTY_CEILINGS)
+    return bands.index(difficulty_of(grade)) - bands.index(difficulty.upper())
+
+
+def band_distance(grade: Grade, difficulty: str) -> int:
+    # How many difficulty bands ``grade`` is away from ``difficulty``.
+    return abs(band_offset(grade, difficulty))
+
+
+class Grader:
+    # Solves a puzzle the way a person would: every step applies the
+    # cheapest technique that makes progress, then starts again from the
+    # top of the ladder. Candidates are kept per cell and only the peers of
+    # a placed cell are touched, so each step costs a scan of the units.
+    def __init__(self, board: Board) -> None:
+        self.size: int = board.size
+        shape = geometry(self.size)
+        self.units, self.peers = shape.units, shape.peers
+        self.cell_units: tuple[tuple[int, int, int], ...] = shape.cell_units
+        self.values: list[int] = [0] * (self.size * self.size)
+        self.candidates: list[int] = [(1 << self.size) - 1] * (self.size * self.size)
+        self.steps: dict[str, int] = {}
+        self.ladder: tuple[Callable[[], bool], ...] = (
+            self.naked_single,
+            self.hidden_single,
+            self.pointing,
+            self.claiming,
+            self.naked_pair,
+            self.hidden_pair,
+            self.naked_triple,
+            self.hidden_triple,
+            self.x_wing,
+        )
+        for index, value in enumerate(board.cells):
+            if value:
+                self.place(index, value)
+
+    def place(self, index: int, value: int) -> None:
+        self.values[index] = value
+        self.candidates[index] = 0
+        mask = ~(1 << (value - 1))
+        for peer in self.peers[index]:
+            self.candidates[peer] &= mask
+
+    def eliminate(self, cells, mask: int) -> bool:
+        progressed = False
+        for index in cells:
+            if self.candidates[index] & mask:
+                self.candidates[index] &= ~mask
+                progressed = True
+        return progressed
+
+    def record(self, technique: str, count: int = 1) -> None:
+        self.steps[technique] = self.steps.get(technique, 0) + count
+
+    def grade(self) -> Grade:
+        return run_steps(self.grade_steps())
+
+    def grade_steps(self) -> Steps:
+        # grade as steps, one technique tried or one guess of the final
+        # search each, see tasks.Task.
+        while 0 in self.values:
+            for technique in self.ladder:
+                progressed = technique()
+                yield
+                if progressed:
+                    break
+            else:
+                yield from self.search_steps()
+                break
+
+        score = sum(TECHNIQUE_COSTS[name] * count for name, count in self.steps.items())
+        hardest = max(
+            self.steps, key=TECHNIQUE_LEVELS.__getitem__, default="naked single"
+        )
+        return Grade(score, hardest, dict(self.steps))
+
+    def search_steps(self) -> Steps:
+        propagator = Propagator(self.size)
+        if propagator.load(self.values):
+            for solution in propagator.walk():
+                if solution is not None:
+                    self.values = solution
+                    break
+                yield
+        self.record("search", max(propagator.branches, 1))
+
+    def naked_single(self) -> bool:
+        found = 0
+        for index, mask in enumerate(self.candidates):
+            if mask and not mask & (mask - 1) and not self.values[index]:
+                self.place(index, mask.bit_length())
+                found += 1
+        if found:
+            self.record("naked single", found)
+        return found > 0
+
+    def hidden_single(self) -> bool:
+        found = 0
+        for unit in self.units:
+            once = more = 0
+            for index in unit:
+                mask = self.candidates[index]
+                more |= once & mask
+                once |= mask
+            for value in iter_values(once & ~more):
+                bit = 1 << (value - 1)
+                for index in unit:
+                    if self.candidates[index] & bit:
+                        self.place(index, value)
+                        found += 1
+                        break
+        if found:
+            self.record("hidden single", found)
+        return found > 0
+
+    def value_cells(self, unit, bit: int) -> list[int]:
+        return [index for index in unit if self.candidates[index] & bit]
+
+    def pointing(self) -> bool:
+        # A value confined to one row or column inside a subgrid cannot
+        # appear elsewhere in that row or column.
+        for unit_id in range(2 * self.size, 3 * self.size):
+            for value in range(1, self.size + 1):
+                bit = 1 << (value - 1)
+                cells = self.value_cells(self.units[unit_id], bit)
+                if len(cells) < 2:
+                    continue
+                for line in (0, 1):
+                    line_id = self.cell_units[cells[0]][line]
+                    if all(self.cell_units[i][line] == line_id for i in cells) and (
+                        self.eliminate(
+                            (i for i in self.units[line_id] if i not in cells), bit
+                        )
+                    ):
+                        self.record("pointing")
+                        return True
+        return False
+
+    def claiming(self) -> bool:
+        # A value confined to one subgrid inside a row or column cannot
+        # appear elsewhere in that subgrid.
+        for unit_id in range(2 * self.size):
+            for value in range(1, self.size + 1):
+                bit = 1 << (value - 1)
+                cells = self.value_cells(self.units[unit_id], bit)
+                if len(cells) < 2:
+                    continue
+                subgrid = self.cell_units[cells[0]][2]
+                if all(self.cell_units[i][2] == subgrid for i in cells) and (
+                    self.eliminate(
+                        (i for i in self.units[subgrid] if i not in cells), bit
+                    )
+                ):
+                    self.record("claiming")
+                    return True
+        return False
+
+    def naked_subset(self, count: int, technique: str) -> bool:
+        # ``count`` cells of a unit sharing ``count`` candidates between them
+        # take those values away from the rest of the unit.
+        for unit in self.units:
+            cells = [
+                index
+                for index in unit
+                if self.candidates[index]
+                and self.candidates[index].bit_count() <= count
+            ]
+            for subset in combinations(cells, count):
+                mask = 0
+                for index in subset:
+                    mask |= self.candidates[index]
+                if mask.bit_count() == count and self.eliminate(
+                    (i for i in unit if i not in subset), mask
+                ):
+                    self.record(technique)
+                    return True
+        return False
+
+    def hidden_subset(self, count: int, technique: str) -> bool:
+        # ``count`` values confined to the same ``count`` cells of a unit
+        # leave no room for other candidates in those cells.
+        for unit in self.units:
+            positions = {}
+            for value in range(1, self.size + 1):
+                cells = self.value_cells(unit, 1 << (value - 1))
+                if 2 <= len(cells) <= count:
+                    positions[value] = cells
+            for values in combinations(positions, count):
+                cells = set()
+                for value in values:
+                    cells.update(positions[value])
+                if len(cells) != count:
+                    continue
+                keep = 0
+                for value in values:
+                    keep |= 1 << (value - 1)
+                if self.eliminate(cells, ~keep):
+                    self.record(technique)
+                    return True
+        return False
+
+    def naked_pair(self) -> bool:
+        return self.naked_subset(2, "naked pair")
+
+    def hidden_pair(self) -> bool:
+        return self.hidden_subset(2, "hidden pair")
+
+    def naked_triple(self) -> bool:
+        return self.naked_subset(3, "naked triple")
+
+    def hidden_triple(self) -> bool:
+        return self.hidden_subset(3, "hidden triple")
+
+    def x_wing(self) -> bool:
+        # Two rows (or columns) whose only places for a value are the same
+        # two columns (or rows) clear that value from the rest of them.
+        size = self.size
+        for base, cover in ((0, 1), (1, 0)):
+            for value in range(1, size + 1):
+                bit = 1 << (value - 1)
+                lines = {}
+                for line_id in range(base * size, base * size + size):
+                    cells = self.value_cells(self.units[line_id], bit)
+                    if len(cells) == 2:
+                        key = tuple(self.cell_units[i][cover] for i in cells)
+                        lines.setdefault(key, []).append(cells)
+                for key, found in lines.items():
+                    if len(found) < 2:
+                        continue
+                    wing = set(found[0] + found[1])
+                    cells = (
+                        i for cover_id in key for i in self.units[cover_id]
+                    )
+                    if self.eliminate((i for i in cells if i not in wing), bit):
+                        self.record("x-wing")
+                        return True
+        return False
+
+
+def grade_board(board: Board) -> Grade:
+    return Grader(board).grade()
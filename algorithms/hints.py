@@ -0,0 +1,183 @@
+from typing import NamedTuple
+
+from .board import Board
+from .constraints import iter_values
+from .geometry import geometry
+from .grader import TECHNIQUES, Grader
+from .propagation import Propagator
+
+
+class Hint(NamedTuple):
+    row: int
+    column: int
+    value: int
+    # A name from grader.TECHNIQUES, or "mistake" when the cell holds a wrong
+    # value and ``value`` is the right one.
+    technique: str
+
+
+def find_single(
+    candidates: list[int], units: tuple[tuple[int, ...], ...]
+) -> tuple[int, int, str] | None:
+    # The first naked or hidden single among ``candidates``, as
+    # (index, value, technique). Filled cells must have no candidates.
+    for index, mask in enumerate(candidates):
+        if mask and not mask & (mask - 1):
+            return index, mask.bit_length(), "naked single"
+    for unit in units:
+        once = more = 0
+        for index in unit:
+            mask = candidates[index]
+            more |= once & mask
+            once |= mask
+        for value in iter_values(once & ~more):
+            bit = 1 << (value - 1)
+            for index in unit:
+                if candidates[index] & bit:
+                    return index, value, "hidden single"
+    return None
+
+
+class CandidateGrid:
+    # The candidates of every cell of a board being played, kept up to date
+    # one entry at a time. Every unit counts how often it holds each value,
+    # so setting or clearing a cell only revisits the cells of its three
+    # units, and cells down to a single candidate are tracked as they
+    # change, so the common hint is a set lookup instead of a solve.
+    def __init__(self, board: Board, solution: Board | None = None) -> None:
+        self.size: int = board.size
+        shape = geometry(self.size)
+        self.units, self.cell_units = shape.units, shape.cell_units
+        self.full_mask: int = (1 << self.size) - 1
+        self.solution: Board | None = solution
+        self.values: list[int] = [0] * shape.cell_count
+        self.candidates: list[int] = [self.full_mask] * shape.cell_count
+        self.counts: list[list[int]] = [
+            [0] * (self.size + 1) for _ in range(3 * self.size)
+        ]
+        self.used: list[int] = [0] * (3 * self.size)
+        self.singles: set[int] = set()
+        self.mistakes: set[int] = set()
+        for index, value in enumerate(board.cells):
+            if value:
+                self.set_value(index, value)
+
+    def set_value(self, index: int, value: int) -> set[int]:
+        # Puts ``value`` (0 to clear) in cell ``index`` and returns the cells
+        # whose candidates changed.
+        previous = self.values[index]
+        if previous == value:
+            return set()
+        changed = {index}
+        if previous:
+            self.remove(index, previous, changed)
+        self.values[index] = value
+        if value:
+            self.add(index, value, changed)
+        self.candidates[index] = 0 if value else self.full_mask & ~self.blocked(index)
+        self.track(index)
+
+        if self.solution is not None and value and value != self.solution.cells[index]:
+            self.mistakes.add(index)
+        else:
+            self.mistakes.discard(index)
+        return changed
+
+    def add(self, index: int, value: int, changed: set[int]) -> None:
+        bit = 1 << (value - 1)
+        for unit in self.cell_units[index]:
+            self.counts[unit][value] += 1
+            if self.counts[unit][value] > 1:
+                continue
+            self.used[unit] |= bit
+            for cell in self.units[unit]:
+                if self.candidates[cell] & bit:
+                    self.candidates[cell] &= ~bit
+                    self.track(cell)
+                    changed.add(cell)
+
+    def remove(self, index: int, value: int, changed: set[int]) -> None:
+        bit = 1 << (value - 1)
+        for unit in self.cell_units[index]:
+            self.counts[unit][value] -= 1
+            if self.counts[unit][value]:
+                continue
+            self.used[unit] &= ~bit
+            for cell in self.units[unit]:
+                if (
+                    not self.values[cell]
+                    and not self.candidates[cell] & bit
+                    and not self.blocked(cell) & bit
+                ):
+                    self.candidates[cell] |= bit
+                    self.track(cell)
+                    changed.add(cell)
+
+    def blocked(self, index: int) -> int:
+        row, column, box = self.cell_units[index]
+        return self.used[row] | self.used[column] | self.used[box]
+
+    def track(self, index: int) -> None:
+        mask = self.candidates[index]
+        if mask and not mask & (mask - 1):
+            self.singles.add(index)
+        else:
+            self.singles.discard(index)
+
+    def candidates_at(self, row: int, column: int) -> list[int]:
+        return list(iter_values(self.candidates[row * self.size + column]))
+
+    def hint(self) -> Hint | None:
+        # The next deduction a player could make, trying the cheapest
+        # techniques first. None when the board is full or contradicts itself.
+        if self.mistakes:
+            index = min(self.mistakes)
+            return self.make_hint(index, self.solution.cells[index], "mistake")
+        if self.singles:
+            index = min(self.singles)
+            value = self.candidates[index].bit_length()
+            return self.make_hint(index, value, "naked single")
+        if 0 not in self.values or any(
+            not mask and not value for mask, value in zip(self.candidates, self.values)
+        ):
+            return None
+        found = find_single(self.candidates, self.units)
+        if found is None:
+            found = self.deduce()
+        return None if found is None else self.make_hint(*found)
+
+    def deduce(self) -> tuple[int, int, str] | None:
+        # Applies the elimination techniques of the grader until a single
+        # appears; the hint names the hardest technique it took.
+        grader = Grader(Board(self.size, self.values))
+        hardest = None
+        while True:
+            for level, technique in enumerate(grader.ladder[2:], 2):
+                if technique():
+                    hardest = max(level, hardest or level)
+                    break
+            else:
+                return self.search()
+            found = find_single(grader.candidates, self.units)
+            if found is not None:
+                return found[0], found[1], TECHNIQUES[hardest][0]
+
+    def search(self) -> tuple[int, int, str] | None:
+        # Nothing short of guessing makes progress: give the value of the
+        # empty cell with the fewest candidates.
+        index = min(
+            (i for i, value in enumerate(self.values) if not value),
+            key=lambda i: self.candidates[i].bit_count(),
+        )
+        if self.solution is not None:
+            return index, self.solution.cells[index], "search"
+        propagator = Propagator(self.size)
+        if not propagator.load(self.values):
+            return None
+        solution = next(propagator.search(), None)
+        if solution is None:
+            return None
+        return index, solution[index], "search"
+
+    def make_hint(self, index: int, value: int, technique: str) -> Hint:
+        return Hint(index // self.size, index % self.size, value, technique)
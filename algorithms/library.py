@@ -0,0 +1,193 @@
+import mmap
+import os
+import random
+import struct
+from bisect import bisect_right
+from typing import Iterable
+
+from .board import Board
+
+# Layout (little endian):
+#   header   magic "PDKL", version, extent count
+#   index    INDEX_CAPACITY extent slots of (size, difficulty, offset, count)
+#   records  extents of fixed-width records, one (size, difficulty) each
+# A record is size, difficulty, grade, then the puzzle and solution boards
+# as size * size bytes of cell values each. Grades above MAX_GRADE are
+# stored as MAX_GRADE.
+MAGIC = b"PDKL"
+VERSION = 1
+INDEX_CAPACITY = 1024
+HEADER = struct.Struct("<4sHxxI")
+EXTENT = struct.Struct("<BBxxQQ")
+RECORD_HEADER = struct.Struct("<BBH")
+DATA_START = HEADER.size + INDEX_CAPACITY * EXTENT.size
+DIFFICULTIES: tuple[str, ...] = ("EASY", "MEDIUM", "HARD", "EXPERT")
+MAX_GRADE = 0xFFFF
+
+
+class LibraryError(ValueError):
+    pass
+
+
+def record_width(size: int) -> int:
+    return RECORD_HEADER.size + 2 * size * size
+
+
+def read_index(header: bytes, file_size: int) -> list[list[int]]:
+    # The extents of a library, checked to lie inside a file of
+    # ``file_size`` bytes.
+    if len(header) < DATA_START:
+        raise LibraryError("Puzzle library is truncated")
+    magic, version, extent_count = HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise LibraryError("Not a pydoku puzzle library")
+    if version != VERSION:
+        raise LibraryError(f"Unsupported puzzle library version {version}")
+    if extent_count > INDEX_CAPACITY:
+        raise LibraryError(f"Puzzle library index has {extent_count} extents")
+    extents = [
+        list(EXTENT.unpack_from(header, HEADER.size + slot * EXTENT.size))
+        for slot in range(extent_count)
+    ]
+    for size, difficulty, offset, count in extents:
+        if (
+            not size
+            or difficulty >= len(DIFFICULTIES)
+            or offset < DATA_START
+            or offset + count * record_width(size) > file_size
+        ):
+            raise LibraryError("Puzzle library index is damaged")
+    return extents
+
+
+class PuzzleLibrary:
+    # Read-only view of a library file. Records are read straight out of a
+    # memory map, so opening costs one header read whatever the file size.
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "rb")
+        try:
+            # mmap refuses empty files, so short ones are rejected first.
+            if os.fstat(self.file.fileno()).st_size < DATA_START:
+                raise LibraryError("Puzzle library is truncated")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.file.close()
+            raise
+        try:
+            index = read_index(self.map[:DATA_START], len(self.map))
+        except BaseException:
+            self.close()
+            raise
+        self.extents: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        self.starts: dict[tuple[int, int], list[int]] = {}
+        for size, difficulty, offset, count in index:
+            key = (size, difficulty)
+            starts = self.starts.setdefault(key, [])
+            extents = self.extents.setdefault(key, [])
+            starts.append(starts[-1] + extents[-1][1] if extents else 0)
+            extents.append((offset, count))
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "PuzzleLibrary":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def count(self, size: int, difficulty: str) -> int:
+        key = (size, DIFFICULTIES.index(difficulty.upper()))
+        if key not in self.extents:
+            return 0
+        return self.starts[key][-1] + self.extents[key][-1][1]
+
+    def get(self, size: int, difficulty: str, number: int) -> tuple[Board, Board, int]:
+        key = (size, DIFFICULTIES.index(difficulty.upper()))
+        if not 0 <= number < self.count(size, difficulty):
+            raise IndexError(f"No puzzle {number} for {size}x{size} {difficulty}")
+        extent = bisect_right(self.starts[key], number) - 1
+        offset, _ = self.extents[key][extent]
+        start = offset + (number - self.starts[key][extent]) * record_width(size)
+        _, _, grade = RECORD_HEADER.unpack_from(self.map, start)
+        cells = size * size
+        puzzle = start + RECORD_HEADER.size
+        return (
+            Board(size, self.map[puzzle : puzzle + cells]),
+            Board(size, self.map[puzzle + cells : puzzle + 2 * cells]),
+            grade,
+        )
+
+    def random_puzzle(self, size: int, difficulty: str) -> tuple[Board, Board] | None:
+        count = self.count(size, difficulty)
+        if not count:
+            return None
+        puzzle, solution, _ = self.get(size, difficulty, random.randrange(count))
+        return puzzle, solution
+
+
+class PuzzleLibraryWriter:
+    # Appends batches to a library file, creating it when missing. Records
+    # are written before the index is updated, so an interrupted append
+    # leaves the previously indexed puzzles intact.
+    def __init__(self, path: str) -> None:
+        if not os.path.exists(path):
+            with open(path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, VERSION, 0))
+                file.write(bytes(INDEX_CAPACITY * EXTENT.size))
+        self.file = open(path, "r+b")
+        try:
+            self.extents = read_index(
+                self.file.read(DATA_START), os.fstat(self.file.fileno()).st_size
+            )
+        except BaseException:
+            self.file.close()
+            raise
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "PuzzleLibraryWriter":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def append(self, puzzles: Iterable[tuple[Board, Board, str, int]]) -> None:
+        # ``puzzles`` yields (puzzle, solution, difficulty, grade) tuples.
+        groups: dict[tuple[int, int], list[bytes]] = {}
+        for puzzle, solution, difficulty, grade in puzzles:
+            if puzzle.size != solution.size:
+                raise LibraryError("Puzzle and solution sizes differ")
+            key = (puzzle.size, DIFFICULTIES.index(difficulty.upper()))
+            groups.setdefault(key, []).append(
+                RECORD_HEADER.pack(*key, min(max(grade, 0), MAX_GRADE))
+                + puzzle.cells
+                + solution.cells
+            )
+
+        end = self.file.seek(0, os.SEEK_END)
+        for (size, difficulty), records in groups.items():
+            last = self.extents[-1] if self.extents else None
+            if (
+                last is not None
+                and last[:2] == [size, difficulty]
+                and last[2] + last[3] * record_width(size) == end
+            ):
+                last[3] += len(records)
+            elif len(self.extents) < INDEX_CAPACITY:
+                self.extents.append([size, difficulty, end, len(records)])
+            else:
+                raise LibraryError("Puzzle library index is full")
+            self.file.write(b"".join(records))
+            end += len(records) * record_width(size)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.extents)))
+        for extent in self.extents:
+            self.file.write(EXTENT.pack(*extent))
+        self.file.flush()
+        os.fsync(self.file.fileno())
@@ -0,0 +1,223 @@
+import random
+from threading import Event
+from typing import Iterator
+
+from .constraints import iter_values
+from .errors import SearchCancelled
+from .geometry import geometry
+from .stats import SearchStats
+
+
+def unit_layout(
+    size: int,
+) -> tuple[tuple[tuple[int, ...], ...], tuple[tuple[int, ...], ...]]:
+    # Returns the cell indices of every row, column and subgrid, and the
+    # peers (cells sharing a unit) of every cell.
+    shape = geometry(size)
+    return shape.units, shape.peers
+
+
+class Propagator:
+    def __init__(
+        self,
+        size: int,
+        cancel_event: Event | None = None,
+        stats: SearchStats | None = None,
+        shuffle: bool = False,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.size: int = size
+        # Tries the candidates of a branching cell in random order, for
+        # filling an empty board with a random solution. The order is drawn
+        # from ``rng``, or the module-level generator of ``random``.
+        self.shuffle: bool = shuffle
+        self.rng = rng or random
+        self.cancel_event: Event | None = cancel_event
+        self.stats: SearchStats | None = stats
+        self.full_mask: int = (1 << size) - 1
+        self.units, self.peers = unit_layout(size)
+        self.values: list[int] = [0] * (size * size)
+        self.candidates: list[int] = [self.full_mask] * (size * size)
+        self.trail: list[tuple[int, int]] = []
+        self.queue: list[int] = []
+        self.branches: int = 0
+
+    def load(self, grid: list[int]) -> bool:
+        for index, value in enumerate(grid):
+            if value and not (
+                self.candidates[index] >> (value - 1) & 1
+                and self.assign(index, value)
+            ):
+                return False
+        return self.propagate()
+
+    def reset(self, values: list[int], candidates: list[int]) -> None:
+        # Starts over from a state kept elsewhere: the values, 0 for empty,
+        # and every cell's candidates, a single bit for a filled cell. They
+        # must agree with each other; nothing is propagated yet.
+        self.values[:] = values
+        self.candidates[:] = candidates
+        self.trail.clear()
+        self.queue = [
+            index
+            for index, mask in enumerate(candidates)
+            if mask and not values[index] and not mask & (mask - 1)
+        ]
+
+    def assign(self, index: int, value: int) -> bool:
+        candidates, values, trail = self.candidates, self.values, self.trail
+        bit = 1 << (value - 1)
+        trail.append((index, candidates[index]))
+        values[index] = value
+        candidates[index] = bit
+        for peer in self.peers[index]:
+            mask = candidates[peer]
+            if mask & bit:
+                if values[peer]:
+                    return False
+                trail.append((peer, mask))
+                mask ^= bit
+                candidates[peer] = mask
+                if not mask:
+                    return False
+                if not mask & (mask - 1):
+                    self.queue.append(peer)
+        return True
+
+    def exclude(self, index: int, value: int) -> bool:
+        mask = self.candidates[index]
+        bit = 1 << (value - 1)
+        if not mask & bit:
+            return True
+        self.trail.append((index, mask))
+        mask ^= bit
+        self.candidates[index] = mask
+        if not mask & (mask - 1):
+            self.queue.append(index)
+        return mask != 0
+
+    def undo(self, mark: int) -> None:
+        candidates, values, trail = self.candidates, self.values, self.trail
+        while len(trail) > mark:
+            index, mask = trail.pop()
+            candidates[index] = mask
+            values[index] = 0
+        self.queue.clear()
+
+    def propagate(self) -> bool:
+        candidates, values, queue = self.candidates, self.values, self.queue
+        while True:
+            # Naked singles: cells left with a single candidate.
+            while queue:
+                index = queue.pop()
+                if not values[index] and not self.assign(
+                    index, candidates[index].bit_length()
+                ):
+                    return False
+
+            # Hidden singles: values with a single possible cell in a unit.
+            progressed = False
+            for unit in self.units:
+                once = more = placed = 0
+                for index in unit:
+                    mask = candidates[index]
+                    if values[index]:
+                        placed |= mask
+                    else:
+                        more |= once & mask
+                        once |= mask
+                if (once | placed) != self.full_mask:
+                    return False
+                singles = once & ~more & ~placed
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    for index in unit:
+                        if not values[index] and candidates[index] & bit:
+                            if not self.assign(index, bit.bit_length()):
+                                return False
+                            progressed = True
+                            break
+                    else:
+                        return False
+            if not progressed and not queue:
+                return True
+
+    def choose_cell(self) -> int:
+        best, best_count = -1, self.size + 1
+        for index, mask in enumerate(self.candidates):
+            if not self.values[index]:
+                count = mask.bit_count()
+                if count < best_count:
+                    best, best_count = index, count
+                    if count <= 2:
+                        break
+        return best
+
+    def walk(self) -> Iterator[list[int] | None]:
+        # The search with an explicit stack instead of recursion, so it can
+        # be paused between any two guesses and boards of any size stay
+        # clear of the recursion limit. Yields None after every guess and a
+        # copy of the values at every solution.
+        stats = self.stats
+        # A frame is the branching cell, its untried values, the trail mark
+        # to undo to and the value being tried there, 0 for none yet.
+        stack: list[list] = []
+        index = self.choose_cell()
+        if index < 0:
+            yield list(self.values)
+            return
+        stack.append(self.frame(index))
+        while stack:
+            frame = stack[-1]
+            index, values, mark, tried = frame
+            depth = len(stack)
+            if tried:
+                self.undo(mark)
+                if stats is not None:
+                    stats.unplace(index, tried, depth)
+                frame[3] = 0
+            if not values:
+                stack.pop()
+                continue
+            value = frame[3] = values.pop()
+            if stats is not None:
+                stats.place(index, value, depth)
+            yield None
+            if self.assign(index, value) and self.propagate():
+                index = self.choose_cell()
+                if index < 0:
+                    yield list(self.values)
+                else:
+                    stack.append(self.frame(index))
+
+    def frame(self, index: int) -> list:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelled
+        self.branches += 1
+        if self.stats is not None:
+            self.stats.test(self.candidates[index].bit_count())
+        values = list(iter_values(self.candidates[index]))
+        if self.shuffle:
+            self.rng.shuffle(values)
+        # Popped from the end, so tried in the order above.
+        values.reverse()
+        return [index, values, len(self.trail), 0]
+
+    def search(self) -> Iterator[list[int]]:
+        for solution in self.walk():
+            if solution is not None:
+                yield solution
+
+
+def solve_grid(
+    grid: list[int],
+    size: int,
+    cancel_event: Event | None = None,
+    stats: SearchStats | None = None,
+) -> Iterator[list[int]]:
+    # ``grid`` is a flat row-major list of values, 0 for an empty cell.
+    # Yields every completion of it as a new flat list.
+    propagator = Propagator(size, cancel_event, stats)
+    if propagator.load(grid):
+        yield from propagator.search()
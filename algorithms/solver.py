@@ -1,80 +1,153 @@
 import random
-from math import floor, sqrt
+from contextlib import nullcontext
+from threading import Event
+from typing import Iterator
+
+from . import dlx, propagation
+from .backtracking import Backtracker
+from .board import Board
+from .constraints import ConstraintState
+from .stats import SearchStats
+from .tasks import Steps, run_steps
+
+BACKENDS: tuple[str, ...] = ("backtracking", "dlx", "propagation")
+
+
+def has_conflicts(board: Board) -> bool:
+    # True when two givens share a value in a row, column or subgrid.
+    constraints = ConstraintState(board.size)
+    for index, value in enumerate(board.cells):
+        if value:
+            row, column = divmod(index, board.size)
+            if not constraints.is_valid(value, row, column):
+                return True
+            constraints.place(value, row, column)
+    return False
 
 
 class Solver:
-    def __init__(self, board: list[list[int | str]], size: int = 9) -> None:
+    def __init__(
+        self,
+        board: Board,
+        size: int = 9,
+        backend: str = "backtracking",
+        cancel_event: Event | None = None,
+        stats: SearchStats | None = None,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown solver backend {backend!r}, expected one of {BACKENDS}"
+            )
         self.size: int = size
-        self.board: list[list[int | str]] = board
-        self.number_to_char = {
-            10: "10",
-            11: "A",
-            12: "B",
-            13: "C",
-            14: "D",
-            15: "E",
-            16: "F",
-        }
-        self.char_to_number: dict[str, int] = {
-            v: k for k, v in self.number_to_char.items()
-        }
-
-    def is_number_in_row(self, number: int | str, row: int) -> bool:
-        return number in self.board[row]
-
-    def is_number_in_column(self, number: int | str, column: int) -> bool:
+        self.board: Board = board
+        self.backend: str = backend
+        self.cancel_event: Event | None = cancel_event
+        self.stats: SearchStats | None = stats
+        self.constraints = ConstraintState(self.size)
+        for index, value in enumerate(self.board.cells):
+            if value:
+                self.constraints.place(value, *divmod(index, self.size))
+
+    def is_number_in_row(self, number: int, row: int) -> bool:
+        return number in self.board.row(row)
+
+    def is_number_in_column(self, number: int, column: int) -> bool:
         for i in range(self.size):
-            if self.board[i][column] == number:
+            if self.board[i, column] == number:
                 return True
         return False
 
-    def is_number_in_subgrid(self, number: int | str, row: int, column: int) -> bool:
-        subgrid_row_size: int = 0
-        subgrid_col_size: int = 0
-        subgrid_size: int = 0
+    def is_number_in_subgrid(self, number: int, row: int, column: int) -> bool:
+        cells = self.board.cells
+        return any(
+            cells[index] == number
+            for index in self.constraints.geometry.box_cells(row, column)
+        )
 
-        if self.size == 6:
-            subgrid_row_size, subgrid_col_size = 2, 3
-        else:
-            subgrid_size = floor(sqrt(self.size))
-            subgrid_row_size, subgrid_col_size = subgrid_size, subgrid_size
+    def is_valid_position(self, number: int, row: int, column: int) -> bool:
+        return self.constraints.is_valid(number, row, column)
+
+    def place_number(self, value: int, row: int, column: int) -> None:
+        self.board[row, column] = value
+        self.constraints.place(value, row, column)
+
+    def remove_number(self, value: int, row: int, column: int) -> None:
+        self.board[row, column] = 0
+        self.constraints.unplace(value, row, column)
+
+    def populate_numbers_in_board(self) -> bool:
+        return run_steps(self.backtracking_steps())
 
-        subgrid_row = row - row % subgrid_row_size
-        subgrid_column = column - column % subgrid_col_size
+    def backtracking_steps(self) -> Steps:
+        return Backtracker(
+            self.board, self.constraints, self.cancel_event, self.stats
+        ).steps()
 
-        for row in range(subgrid_row, subgrid_row + subgrid_size):
-            for column in range(subgrid_column, subgrid_column + subgrid_size):
-                if self.board[row][column] == number:
-                    return True
+    def get_values(self) -> list[int]:
+        return list(self.board.cells)
+
+    def set_values(self, values: list[int]) -> None:
+        for index, value in enumerate(values):
+            row, column = divmod(index, self.size)
+            if value and self.board[row, column] == 0:
+                self.place_number(value, row, column)
+
+    def populate_numbers_with_dlx(self) -> bool:
+        for solution in dlx.solve_grid(
+            self.get_values(), self.size, self.cancel_event, self.stats
+        ):
+            self.set_values(solution)
+            return True
+        return False
+
+    def populate_numbers_with_propagation(self) -> bool:
+        return run_steps(self.propagation_steps())
+
+    def propagation_steps(self) -> Steps:
+        propagator = propagation.Propagator(self.size, self.cancel_event, self.stats)
+        if not propagator.load(self.get_values()):
+            return False
+        for solution in propagator.walk():
+            if solution is not None:
+                self.set_values(solution)
+                return True
+            yield
         return False
 
-    def is_valid_position(self, number: int | str, row: int, column: int) -> bool:
-        return (
-            not self.is_number_in_row(number=number, row=row)
-            and not self.is_number_in_column(number=number, column=column)
-            and not self.is_number_in_subgrid(number=number, row=row, column=column)
+    def iter_solutions(self) -> Iterator[list[int]]:
+        if self.backend == "dlx":
+            return dlx.solve_grid(
+                self.get_values(), self.size, self.cancel_event, self.stats
+            )
+        return propagation.solve_grid(
+            self.get_values(), self.size, self.cancel_event, self.stats
         )
 
-    def populate_numbers_in_board(self) -> bool:
-        for row in range(self.size):
-            for column in range(self.size):
-                if self.board[row][column] == 0:
-                    numbers = (
-                        list(range(1, 10)) + list(self.number_to_char.values())
-                        if self.size == 16
-                        else list(range(1, self.size + 1))
-                    )
-                    for number in numbers:
-                        if self.is_valid_position(
-                            number=number, row=row, column=column
-                        ):
-                            self.board[row][column] = number
-                            if self.populate_numbers_in_board():
-                                return True
-                            self.board[row][column] = 0
-                    return False
-        return True
-
-    def solve_board(self) -> list[list[int | str]]:
-        self.populate_numbers_in_board()
+    def count_solutions(self, limit: int = 2) -> int:
+        count = 0
+        for _ in self.iter_solutions():
+            count += 1
+            if count >= limit:
+                break
+        return count
+
+    def phase(self, name: str):
+        return nullcontext() if self.stats is None else self.stats.phase(name)
+
+    def phase_steps(self, name: str, steps: Steps) -> Steps:
+        return steps if self.stats is None else self.stats.phase_steps(name, steps)
+
+    def solve_board(self) -> Board:
+        return run_steps(self.solve_steps())
+
+    def solve_steps(self) -> Steps:
+        # solve_board as steps, see tasks.Task. The dlx search runs as a
+        # single step.
+        if self.backend == "dlx":
+            with self.phase("solve"):
+                self.populate_numbers_with_dlx()
+        elif self.backend == "propagation":
+            yield from self.phase_steps("solve", self.propagation_steps())
+        else:
+            yield from self.phase_steps("solve", self.backtracking_steps())
         return self.board
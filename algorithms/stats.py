@@ -0,0 +1,91 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from .tasks import Steps
+
+# ``trace(event, index, value, depth)`` with event "place" or "unplace", the
+# flat cell index, the value tried there and the number of guesses on the
+# search path including this one.
+TraceCallback = Callable[[str, int, int, int], None]
+
+
+class SearchStats:
+    # Opt-in counters for a search. Solvers and generators only touch it when
+    # one is passed in, so leaving it out costs a None check per guess.
+    def __init__(self, trace: TraceCallback | None = None, sample_every: int = 1):
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.trace: TraceCallback | None = trace
+        self.sample_every: int = sample_every
+        self.nodes: int = 0
+        self.backtracks: int = 0
+        self.max_depth: int = 0
+        self.candidate_tests: int = 0
+        # Seconds spent in each phase. Phases are exclusive: time in a phase
+        # nested inside another counts towards the inner one only.
+        self.phase_times: dict[str, float] = {}
+        # Seconds counted towards any phase so far, so an enclosing phase
+        # can leave out what its nested phases took.
+        self.phased: float = 0.0
+        self.events: int = 0
+
+    def place(self, index: int, value: int, depth: int) -> None:
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.trace is not None:
+            self.sample("place", index, value, depth)
+
+    def unplace(self, index: int, value: int, depth: int) -> None:
+        self.backtracks += 1
+        if self.trace is not None:
+            self.sample("unplace", index, value, depth)
+
+    def test(self, count: int) -> None:
+        # ``count`` candidate values were considered for a branching cell.
+        self.candidate_tests += count
+
+    def sample(self, event: str, index: int, value: int, depth: int) -> None:
+        self.events += 1
+        if self.events % self.sample_every == 0:
+            self.trace(event, index, value, depth)
+
+    def charge(self, name: str, start: float, phased: float) -> None:
+        own = time.perf_counter() - start - (self.phased - phased)
+        self.phase_times[name] = self.phase_times.get(name, 0.0) + own
+        self.phased += own
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # For a block that does not yield; steps are timed with phase_steps.
+        start, phased = time.perf_counter(), self.phased
+        try:
+            yield
+        finally:
+            self.charge(name, start, phased)
+
+    def phase_steps(self, name: str, steps: Steps) -> Steps:
+        # Runs ``steps``, counting the time spent advancing them towards
+        # ``name`` but not the time they sit suspended between steps.
+        try:
+            while True:
+                start, phased = time.perf_counter(), self.phased
+                try:
+                    next(steps)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    self.charge(name, start, phased)
+                yield
+        finally:
+            steps.close()
+
+    def as_dict(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "candidate_tests": self.candidate_tests,
+            "phase_times": dict(self.phase_times),
+        }
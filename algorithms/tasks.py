@@ -0,0 +1,53 @@
+import time
+from typing import Any, Generator
+
+# A long computation written as a generator that yields None between small
+# units of work (one guess of a search, one clue tried by the generator) and
+# returns its result. Nothing runs until it is advanced, so it can be driven
+# to the end, a number of steps at a time or for a slice of time.
+Steps = Generator[None, None, Any]
+
+
+def run_steps(steps: Steps) -> Any:
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+class Task:
+    # Advances ``steps`` on demand and keeps its result. Used to give a
+    # search an exact budget, or to run it on an event loop in slices that
+    # leave the loop free in between.
+    def __init__(self, steps: Steps) -> None:
+        self.steps: Steps = steps
+        self.done: bool = False
+        self.result: Any = None
+        self.count: int = 0
+
+    def step(self, budget: int = 1) -> bool:
+        # Runs at most ``budget`` steps and returns whether the task is done.
+        steps = self.steps
+        while budget > 0 and not self.done:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                self.done = True
+                self.result = stop.value
+                break
+            self.count += 1
+            budget -= 1
+        return self.done
+
+    def run_for(self, seconds: float, check_every: int = 16) -> bool:
+        # Runs until done or until ``seconds`` have passed, looking at the
+        # clock every ``check_every`` steps.
+        deadline = time.perf_counter() + seconds
+        while not self.step(check_every):
+            if time.perf_counter() >= deadline:
+                break
+        return self.done
+
+    def close(self) -> None:
+        self.steps.close()
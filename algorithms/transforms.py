@@ -0,0 +1,178 @@
+import random
+from typing import NamedTuple, Sequence
+
+from .constraints import subgrid_shape
+
+
+def canonical_grid(size: int) -> list[int]:
+    # A valid solved grid as a flat row-major list of values 1..size: each
+    # row is the first one shifted by a whole subgrid width, and each band
+    # is the one above it shifted by one more.
+    subgrid_rows, subgrid_cols = subgrid_shape(size)
+    return [
+        (subgrid_cols * (row % subgrid_rows) + row // subgrid_rows + column) % size
+        + 1
+        for row in range(size)
+        for column in range(size)
+    ]
+
+
+def shuffled_lines(
+    size: int, group: int, rng: random.Random | None = None
+) -> list[int]:
+    # A permutation of 0..size-1 that keeps lines inside their band (or
+    # stack) of ``group`` lines, shuffling the bands and the lines in them.
+    rng = rng or random
+    groups = list(range(size // group))
+    rng.shuffle(groups)
+    order = []
+    for first in groups:
+        lines = list(range(first * group, first * group + group))
+        rng.shuffle(lines)
+        order.extend(lines)
+    return order
+
+
+def random_solved_grid(size: int, rng: random.Random | None = None) -> list[int]:
+    # ``rng`` defaults to the module-level generator of ``random``.
+    rng = rng or random
+    subgrid_rows, subgrid_cols = subgrid_shape(size)
+    grid = canonical_grid(size)
+
+    labels = list(range(1, size + 1))
+    rng.shuffle(labels)
+    row_order = shuffled_lines(size, subgrid_rows, rng)
+    column_order = shuffled_lines(size, subgrid_cols, rng)
+
+    if subgrid_rows == subgrid_cols and rng.random() < 0.5:
+        return [
+            labels[grid[column_order[column] * size + row_order[row]] - 1]
+            for row in range(size)
+            for column in range(size)
+        ]
+    return [
+        labels[grid[row_order[row] * size + column_order[column]] - 1]
+        for row in range(size)
+        for column in range(size)
+    ]
+
+
+class Transform(NamedTuple):
+    # Maps a grid to an equivalent one: optionally transpose it, then take
+    # row ``row_order[i]`` as row ``i`` and column ``column_order[j]`` as
+    # column ``j``, then replace every value ``v`` with ``labels[v]``.
+    size: int
+    transposed: bool
+    row_order: tuple[int, ...]
+    column_order: tuple[int, ...]
+    labels: tuple[int, ...]
+
+    def apply(self, grid: Sequence[int]) -> list[int]:
+        size, labels = self.size, self.labels
+        if self.transposed:
+            grid = transposed(grid, size)
+        return [
+            labels[grid[row * size + column]]
+            for row in self.row_order
+            for column in self.column_order
+        ]
+
+    def invert(self, grid: Sequence[int]) -> list[int]:
+        size = self.size
+        inverse_labels = [0] * (size + 1)
+        for value, label in enumerate(self.labels):
+            inverse_labels[label] = value
+        original = [0] * (size * size)
+        for i, row in enumerate(self.row_order):
+            for j, column in enumerate(self.column_order):
+                original[row * size + column] = inverse_labels[grid[i * size + j]]
+        return transposed(original, size) if self.transposed else original
+
+
+def transposed(grid: Sequence[int], size: int) -> list[int]:
+    return [grid[column * size + row] for row in range(size) for column in range(size)]
+
+
+def line_order(keys: list[tuple], group: int) -> tuple[int, ...]:
+    # Sorts the bands of ``group`` lines by their sorted line keys, then the
+    # lines inside each band by key. Sorting is stable, so lines with equal
+    # keys keep their order.
+    bands = sorted(
+        range(len(keys) // group),
+        key=lambda band: sorted(keys[band * group : band * group + group]),
+    )
+    order = []
+    for band in bands:
+        order.extend(
+            sorted(range(band * group, band * group + group), key=keys.__getitem__)
+        )
+    return tuple(order)
+
+
+def oriented_transform(grid: Sequence[int], size: int, transpose: bool) -> Transform:
+    subgrid_rows, subgrid_cols = subgrid_shape(size)
+    if transpose:
+        grid = transposed(grid, size)
+    row_counts = [0] * size
+    column_counts = [0] * size
+    for index, value in enumerate(grid):
+        if value:
+            row_counts[index // size] += 1
+            column_counts[index % size] += 1
+    # Line keys only use clue counts, which no relabeling or permutation of
+    # the other lines can change.
+    row_keys = [
+        (
+            row_counts[row],
+            tuple(
+                sorted(
+                    column_counts[column]
+                    for column in range(size)
+                    if grid[row * size + column]
+                )
+            ),
+        )
+        for row in range(size)
+    ]
+    column_keys = [
+        (
+            column_counts[column],
+            tuple(
+                sorted(
+                    row_counts[row] for row in range(size) if grid[row * size + column]
+                )
+            ),
+        )
+        for column in range(size)
+    ]
+    row_order = line_order(row_keys, subgrid_rows)
+    column_order = line_order(column_keys, subgrid_cols)
+
+    # Values are numbered in order of first appearance in the reordered grid.
+    labels = [0] * (size + 1)
+    next_label = 1
+    for row in row_order:
+        for column in column_order:
+            value = grid[row * size + column]
+            if value and not labels[value]:
+                labels[value] = next_label
+                next_label += 1
+    for value in range(1, size + 1):
+        if not labels[value]:
+            labels[value] = next_label
+            next_label += 1
+    return Transform(size, transpose, row_order, column_order, tuple(labels))
+
+
+def canonical_transform(grid: Sequence[int], size: int) -> Transform:
+    # A transform taking ``grid`` to a canonical form shared by the grids it
+    # is equivalent to under relabeling, band, stack, row and column
+    # permutations and transposition. Lines are ordered by clue-count
+    # invariants rather than by an exhaustive search, so equivalent grids
+    # whose lines tie on those invariants can still get different forms;
+    # two grids with the same form are always equivalent.
+    candidates = [oriented_transform(grid, size, False)]
+    subgrid_rows, subgrid_cols = subgrid_shape(size)
+    if subgrid_rows == subgrid_cols:
+        candidates.append(oriented_transform(grid, size, True))
+    return min(candidates, key=lambda transform: transform.apply(grid))
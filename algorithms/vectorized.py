@@ -0,0 +1,105 @@
+# Needs numpy, see requirements-optional.txt.
+import numpy as np
+
+from .constraints import subgrid_shape
+
+# Batch checks over an (N, size, size) integer array of boards, with 0 for
+# an empty cell. Every function works on all N boards at once.
+
+
+def check_shape(boards: np.ndarray) -> int:
+    if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+        raise ValueError(f"Expected an (N, size, size) array, got {boards.shape}")
+    return boards.shape[1]
+
+
+def subgrid_view(boards: np.ndarray) -> np.ndarray:
+    # Reorders cells so that axis 1 is the subgrid and axis 2 the cell in it.
+    size = check_shape(boards)
+    subgrid_rows, subgrid_cols = subgrid_shape(size)
+    return (
+        boards.reshape(
+            len(boards),
+            size // subgrid_rows,
+            subgrid_rows,
+            size // subgrid_cols,
+            subgrid_cols,
+        )
+        .transpose(0, 1, 3, 2, 4)
+        .reshape(len(boards), size, size)
+    )
+
+
+def subgrid_ids(size: int) -> np.ndarray:
+    subgrid_rows, subgrid_cols = subgrid_shape(size)
+    rows, columns = np.indices((size, size))
+    return (rows // subgrid_rows) * (size // subgrid_cols) + columns // subgrid_cols
+
+
+def value_counts(boards: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # How often each value occurs in every row, column and subgrid, as three
+    # (N, size, size) arrays indexed by [board, unit, value - 1].
+    size = check_shape(boards)
+    values = np.arange(1, size + 1)
+    one_hot = boards[..., None] == values
+    subgrid_one_hot = subgrid_view(boards)[..., None] == values
+    return (
+        one_hot.sum(axis=2),
+        one_hot.sum(axis=1),
+        subgrid_one_hot.sum(axis=2),
+    )
+
+
+def conflict_free(boards: np.ndarray) -> np.ndarray:
+    # True for boards, complete or not, with no value repeated in a unit.
+    return np.logical_and.reduce(
+        [(counts <= 1).all(axis=(1, 2)) for counts in value_counts(boards)]
+    )
+
+
+def is_solved(boards: np.ndarray) -> np.ndarray:
+    # True for complete boards holding every value once in every unit.
+    return np.logical_and.reduce(
+        [(counts == 1).all(axis=(1, 2)) for counts in value_counts(boards)]
+    )
+
+
+def givens_match(puzzles: np.ndarray, solutions: np.ndarray) -> np.ndarray:
+    # True where every given of a puzzle equals its solution's cell.
+    if puzzles.shape != solutions.shape:
+        raise ValueError("Puzzles and solutions must have the same shape")
+    return ((puzzles == 0) | (puzzles == solutions)).all(axis=(1, 2))
+
+
+def value_bits(boards: np.ndarray) -> np.ndarray:
+    boards = boards.astype(np.uint64)
+    shifts = np.maximum(boards, np.uint64(1)) - np.uint64(1)
+    return np.where(boards > 0, np.left_shift(np.uint64(1), shifts), np.uint64(0))
+
+
+def unit_masks(boards: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Occupancy bitmasks per row, column and subgrid, each (N, size); value
+    # ``v`` is bit ``v - 1`` as in ConstraintState.
+    check_shape(boards)
+    bits = value_bits(boards)
+    return (
+        np.bitwise_or.reduce(bits, axis=2),
+        np.bitwise_or.reduce(bits, axis=1),
+        np.bitwise_or.reduce(value_bits(subgrid_view(boards)), axis=2),
+    )
+
+
+def candidate_masks(boards: np.ndarray) -> np.ndarray:
+    # (N, size, size) candidate bitmasks; filled cells have no candidates.
+    size = check_shape(boards)
+    rows, columns, subgrids = unit_masks(boards)
+    used = rows[:, :, None] | columns[:, None, :] | subgrids[:, subgrid_ids(size)]
+    full = np.uint64((1 << size) - 1)
+    return np.where(boards == 0, ~used & full, np.uint64(0))
+
+
+def candidate_counts(boards: np.ndarray) -> np.ndarray:
+    size = check_shape(boards)
+    masks = candidate_masks(boards)
+    shifts = np.arange(size, dtype=np.uint64)
+    return ((masks[..., None] >> shifts) & np.uint64(1)).sum(axis=-1)
@@ -0,0 +1,2 @@
+# Marks the repository root, so pytest puts it on sys.path and the tests can
+# import algorithms and pydoku without installing them.
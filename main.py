@@ -1,8 +1,11 @@
 import sys
+import time
+
+started = time.perf_counter()
 
 from pydoku.ui.application import MainApplication
 
 
 if __name__ == "__main__":
-    app = MainApplication()
+    app = MainApplication(started=started)
     app.run(sys.argv)
@@ -1,8 +1,25 @@
 import os
 
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
 PATH = "/".join(__file__.split("/")[:-1])
+# Saved games and the puzzle library belong to the user, not to the source
+# tree.
+DATA_DIR = os.environ.get(
+    "PYDOKU_DATA_DIR", os.path.join(GLib.get_user_data_dir(), "pydoku")
+)
 
 
-MENU_XML = open(f"{PATH}/ui/menu.xml").read()
-LICENSE = open(f"{PATH}/../LICENSE").read()
+MENU_XML_FILE = f"{PATH}/ui/menu.xml"
+LICENSE_FILE = f"{PATH}/../LICENSE"
 MAIN_CSS = f"{PATH}/ui/styles/main.css"
+SAVE_FILE = f"{DATA_DIR}/game_data.sav"
+PUZZLE_LIBRARY = os.environ.get("PYDOKU_PUZZLE_LIBRARY", f"{DATA_DIR}/puzzles.pdl")
+
+PUZZLE_POOL_CAPACITY = 3
+PUZZLE_POOL_REFILL_BELOW = 2
+
+STARTUP_TIMING = bool(os.environ.get("PYDOKU_STARTUP_TIMING"))
@@ -0,0 +1,111 @@
+import threading
+from collections import deque
+
+from algorithms.board import Board
+from algorithms.errors import SearchCancelled
+from algorithms.generator import Generator
+from algorithms.tasks import Steps, run_steps
+
+# Puzzles are graded into their band up to this size; on larger boards a
+# grade costs too much to repeat while the player waits, and the clue count
+# alone decides the difficulty.
+GRADED_MAX_SIZE = 12
+# Seconds a graded puzzle may take before the closest one found is used.
+GRADED_TIME_LIMIT = 2.0
+
+
+def make_puzzle(
+    size: int, difficulty: str, cancel_event: threading.Event | None = None
+) -> tuple[Board, Board]:
+    return run_steps(puzzle_steps(size, difficulty, cancel_event))
+
+
+def puzzle_steps(
+    size: int, difficulty: str, cancel_event: threading.Event | None = None
+) -> Steps:
+    # make_puzzle as steps, see algorithms.tasks. The puzzle is unique, so
+    # the grid it was dug from is its solution.
+    generator = Generator(
+        difficulty=difficulty,
+        size=size,
+        unique=True,
+        method="transform",
+        cancel_event=cancel_event,
+        graded=size <= GRADED_MAX_SIZE,
+        time_limit=GRADED_TIME_LIMIT,
+    )
+    puzzle = yield from generator.steps()
+    return puzzle, generator.solution
+
+
+class PuzzlePool:
+    # Keeps up to ``capacity`` ready (puzzle, solution) pairs for every
+    # (size, difficulty) a puzzle has been taken for, so only the ones the
+    # player actually picks are generated. A background thread starts
+    # refilling a combination once it drops below ``refill_below`` and keeps
+    # going until it is full again.
+    def __init__(self, capacity: int = 3, refill_below: int = 2) -> None:
+        self.capacity: int = capacity
+        self.refill_below: int = min(refill_below, capacity)
+        self.puzzles: dict[tuple[int, str], deque] = {}
+        self.refilling: set[tuple[int, str]] = set()
+        self.condition = threading.Condition()
+        self.thread: threading.Thread | None = None
+        self.stop_event = threading.Event()
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(
+                target=self.run,
+                args=(self.stop_event,),
+                name="puzzle-pool",
+                daemon=True,
+            )
+            self.thread.start()
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stop_event.set()
+            self.condition.notify_all()
+        self.thread = None
+
+    def take_ready(self, size: int, difficulty: str) -> tuple[Board, Board] | None:
+        key = (size, difficulty.upper())
+        with self.condition:
+            ready = self.puzzles.get(key)
+            puzzle = ready.popleft() if ready else None
+            self.update_refilling(key)
+            self.condition.notify_all()
+        return puzzle
+
+    def update_refilling(self, key: tuple[int, str]) -> None:
+        ready = self.puzzles.setdefault(key, deque())
+        if len(ready) < self.refill_below:
+            self.refilling.add(key)
+        elif len(ready) >= self.capacity:
+            self.refilling.discard(key)
+
+    def next_key(self) -> tuple[int, str] | None:
+        if not self.refilling:
+            return None
+        return min(self.refilling, key=lambda key: len(self.puzzles[key]))
+
+    def run(self, stop_event: threading.Event) -> None:
+        while True:
+            with self.condition:
+                key = self.next_key()
+                while key is None and not stop_event.is_set():
+                    self.condition.wait()
+                    key = self.next_key()
+                if stop_event.is_set():
+                    return
+            try:
+                puzzle = make_puzzle(*key, cancel_event=stop_event)
+            except SearchCancelled:
+                return
+            with self.condition:
+                if len(self.puzzles[key]) < self.capacity:
+                    self.puzzles[key].append(puzzle)
+                self.update_refilling(key)
+                self.condition.notify_all()
@@ -0,0 +1,112 @@
+import os
+import struct
+import tempfile
+import zlib
+from typing import NamedTuple
+
+from algorithms.board import Board
+from algorithms.generator import SIZE_DIFFICULTIES
+
+# Layout (little endian):
+#   header   magic "PDKS", version, board size, difficulty index, reserved,
+#            remaining timer seconds
+#   records  initial board, current board, solved board, each size * size
+#            bytes of cell values
+#   trailer  CRC-32 of everything before it
+MAGIC = b"PDKS"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBI")
+TRAILER = struct.Struct("<I")
+DIFFICULTIES: tuple[str, ...] = ("Easy", "Medium", "Hard", "Expert")
+
+
+class SaveFileError(ValueError):
+    pass
+
+
+class SavedGame(NamedTuple):
+    size: int
+    difficulty: str
+    timer: int
+    initial_board: Board
+    current_board: Board
+    solved_board: Board
+
+
+def encode_game(game: SavedGame) -> bytes:
+    cells = game.size * game.size
+    for board in (game.initial_board, game.current_board, game.solved_board):
+        if len(board.cells) != cells:
+            raise SaveFileError(f"Board does not have {cells} cells")
+    payload = b"".join(
+        (
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                game.size,
+                DIFFICULTIES.index(game.difficulty.title()),
+                0,
+                max(game.timer, 0),
+            ),
+            game.initial_board.cells,
+            game.current_board.cells,
+            game.solved_board.cells,
+        )
+    )
+    return payload + TRAILER.pack(zlib.crc32(payload))
+
+
+def decode_game(data: bytes) -> SavedGame:
+    if len(data) < HEADER.size + TRAILER.size:
+        raise SaveFileError("Save file is truncated")
+    magic, version, size, difficulty, _, timer = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveFileError("Not a pydoku save file")
+    if version != VERSION:
+        raise SaveFileError(f"Unsupported save file version {version}")
+    if size not in SIZE_DIFFICULTIES:
+        raise SaveFileError(f"Unsupported board size {size}")
+    cells = size * size
+    end = HEADER.size + 3 * cells
+    if len(data) != end + TRAILER.size:
+        raise SaveFileError("Save file has the wrong length")
+    (checksum,) = TRAILER.unpack_from(data, end)
+    if checksum != zlib.crc32(memoryview(data)[:end]):
+        raise SaveFileError("Save file checksum does not match")
+    if difficulty >= len(DIFFICULTIES):
+        raise SaveFileError(f"Unknown difficulty index {difficulty}")
+    if max(data[HEADER.size : end]) > size:
+        raise SaveFileError(f"Save file has a cell value above {size}")
+
+    boards = [
+        Board(size, data[start : start + cells])
+        for start in range(HEADER.size, end, cells)
+    ]
+    return SavedGame(size, DIFFICULTIES[difficulty], timer, *boards)
+
+
+def load_game(path: str) -> SavedGame | None:
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    return decode_game(data)
+
+
+def save_game(path: str, game: SavedGame) -> None:
+    data = encode_game(game)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # Write next to the target and rename over it, so a crash mid-write
+    # never leaves a half-written save behind.
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
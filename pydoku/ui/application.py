@@ -1,14 +1,26 @@
-import csv, os, gi
+import os, gi
 
-from algorithms.generator import Generator
-from algorithms.solver import Solver
+from algorithms.generator import SIZE_DIFFICULTIES
+from algorithms.library import LibraryError, PuzzleLibrary
 from .game_frame import GridFrame, SideFrame
+from .jobs import IdleJob
 
 gi.require_version(namespace="Gtk", version="4.0")
 from gi.repository import Gtk, Gio, Gdk, GLib
 
-from ..constants import MAIN_CSS, MENU_XML, LICENSE
-from ..utils import load_css
+from ..constants import (
+    MAIN_CSS,
+    MENU_XML_FILE,
+    LICENSE_FILE,
+    PUZZLE_POOL_CAPACITY,
+    PUZZLE_POOL_REFILL_BELOW,
+    PUZZLE_LIBRARY,
+    SAVE_FILE,
+    STARTUP_TIMING,
+)
+from ..puzzle_pool import PuzzlePool, puzzle_steps
+from ..save_file import SaveFileError, SavedGame, load_game, save_game
+from ..utils import StartupTimer, load_css, read_text
 
 
 class MainApplicationWindow(Gtk.ApplicationWindow):
@@ -23,25 +35,40 @@ class MainApplicationWindow(Gtk.ApplicationWindow):
 
 
 class MainApplication(Gtk.Application):
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(self, *args, started=None, **kwargs) -> None:
         super().__init__(*args, application_id="com.github.victorchiaka", **kwargs)
 
-        load_css(css_file=MAIN_CSS)
+        self.startup_timer = StartupTimer(started)
         self.window = None
         self.timer_id = None
         self.current_difficulty = None
-        self.solved_board = []
+        self.solved_board = None
         self.initial_board = None
-        self.generated_board = []
+        self.generated_board = None
         self.current_time = None
         self.difficulty = None
         self.header_bar = Gtk.HeaderBar()
 
         self.stack = []
         self.current_board_state = []
+        self.grid_frame = None
+        self.side_frame = None
+        self.game_screens = {}
+        # The save file is read after the first frame; until then it must
+        # not be overwritten or removed.
+        self.saved_game_pending = True
+        self.first_frame_handler = None
+        self.job = None
+        self.puzzle_pool = PuzzlePool(
+            capacity=PUZZLE_POOL_CAPACITY, refill_below=PUZZLE_POOL_REFILL_BELOW
+        )
+        # Opened after the first frame, with the saved game; until then new
+        # puzzles come from the pool.
+        self.puzzle_library = None
 
     def do_activate(self):
-        if not self.window:
+        first_activation = self.window is None
+        if first_activation:
             self.window = MainApplicationWindow(application=self, title="Pydoku")
 
             grid_type_box = Gtk.Grid()
@@ -55,7 +82,7 @@ class MainApplication(Gtk.Application):
             self.window.set_titlebar(self.header_bar)
 
             image = Gtk.Image.new_from_icon_name("open-menu-symbolic")
-            builder = Gtk.Builder.new_from_string(MENU_XML, -1)
+            builder = Gtk.Builder.new_from_file(MENU_XML_FILE)
             menu_model = builder.get_object("menubar")
             menu = Gtk.MenuButton(menu_model=menu_model)
 
@@ -64,8 +91,11 @@ class MainApplication(Gtk.Application):
 
             grid_types = [
                 {"type": "6x6", "value": "6"},
+                {"type": "8x8", "value": "8"},
                 {"type": "9x9", "value": "9"},
+                {"type": "12x12", "value": "12"},
                 {"type": "16x16", "value": "16"},
+                {"type": "25x25", "value": "25"},
             ]
 
             for i, grid_type in enumerate(grid_types):
@@ -83,6 +113,29 @@ class MainApplication(Gtk.Application):
             self.window.set_child(grid_type_box)
 
         self.window.present()
+        if first_activation:
+            self.startup_timer.mark("window presented")
+            self.first_frame_handler = self.window.get_frame_clock().connect(
+                "after-paint", self.on_first_frame
+            )
+
+    def on_first_frame(self, frame_clock):
+        frame_clock.disconnect(self.first_frame_handler)
+        self.first_frame_handler = None
+        self.startup_timer.mark("first frame")
+        GLib.idle_add(self.restore_saved_game)
+
+    def restore_saved_game(self):
+        self.puzzle_library = self.open_puzzle_library()
+        self.startup_timer.mark("puzzle library open")
+        # Skipped if a game was started before the idle callback ran.
+        if len(self.stack) == 1:
+            self.initialize_game_from_data(self.read_game_data())
+        self.saved_game_pending = False
+        self.startup_timer.mark("saved game restored")
+        if STARTUP_TIMING:
+            self.startup_timer.report()
+        return GLib.SOURCE_REMOVE
 
     def show_difficulty_type(self, _widget, board_size):
         self.initial_board = None
@@ -95,11 +148,9 @@ class MainApplication(Gtk.Application):
         difficulty_label.add_css_class("difficulty-label")
         self.difficulty_box.append(difficulty_label)
 
-        self.difficulties = (
-            ["Medium", "Hard", "Expert"]
-            if self.board_size == 16
-            else ["Easy", "Medium", "Hard", "Expert"]
-        )
+        self.difficulties = [
+            difficulty.capitalize() for difficulty in SIZE_DIFFICULTIES[board_size]
+        ]
 
         for self.difficulty in self.difficulties:
             button = Gtk.Button(label=self.difficulty)
@@ -119,82 +170,149 @@ class MainApplication(Gtk.Application):
         self.window.set_child(self.difficulty_box)
 
     def show_sudoku_gameplay_screen(self, _widget, difficulty) -> None:
-        if not self.initial_board:
-            self.initial_board = Generator(
-                difficulty=difficulty, size=self.board_size
-            ).generate_board()
+        self.cancel_job()
         self.current_difficulty = difficulty
+        board_size = self.board_size
+
+        if self.initial_board is None:
+            puzzle = self.take_library_puzzle(
+                board_size, difficulty
+            ) or self.puzzle_pool.take_ready(board_size, difficulty)
+            if puzzle:
+                self.initial_board, self.solved_board = puzzle
+                self.show_game_screen()
+            else:
+                # Generated on the main loop in short slices, see IdleJob.
+                self.run_idle_job(
+                    puzzle_steps(board_size, difficulty), self.on_puzzle_ready
+                )
+            return
 
-        self.board_copy: list[list[int | str]] = [
-            [0 for _ in range(self.board_size)] for _ in range(self.board_size)
-        ]
+        # Restarting: the solution came with the puzzle.
+        self.show_game_screen()
+
+    def open_puzzle_library(self):
+        if not os.path.exists(PUZZLE_LIBRARY):
+            return None
+        try:
+            return PuzzleLibrary(PUZZLE_LIBRARY)
+        except (OSError, LibraryError) as e:
+            print(f"Error opening puzzle library: {e}")
+            return None
 
-        for row in range(self.board_size):
-            for column in range(self.board_size):
-                self.board_copy[row][column] = self.initial_board[row][column]
+    def take_library_puzzle(self, board_size, difficulty):
+        if self.puzzle_library is None:
+            return None
+        return self.puzzle_library.random_puzzle(board_size, difficulty)
 
-        self.solved_board: list[list[int | str]] = Solver(
-            board=self.board_copy, size=self.board_size
-        ).solve_board()
+    def run_idle_job(self, steps, on_done) -> None:
+        self.show_generating_screen()
+        self.job = IdleJob(steps, on_done, self.on_job_failed)
+        self.job.start()
 
-        game_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+    def cancel_job(self) -> None:
+        if self.job:
+            self.job.cancel()
+            self.job = None
 
-        if not self.window:
-            self.window = MainApplicationWindow(application=self, title="Pydoku")
-            self.window.set_child(self.game_box)
+    def on_puzzle_ready(self, puzzle) -> None:
+        self.initial_board, self.solved_board = puzzle
+        self.job = None
+        self.stack.pop()
+        self.show_game_screen()
 
-        self.timer = 300
-        self.side_frame = SideFrame(
-            self.timer,
-            self.restart_game,
-            self.pause_game,
-            self.new_board,
-            self.time_up,
+    def on_job_failed(self, error) -> None:
+        # Leaves the "Generating…" screen for the one before it and says why.
+        self.job = None
+        self.stack.pop()
+        self.window.set_child(self.stack[-1])
+        dialog = Gtk.MessageDialog(
+            transient_for=self.window,
+            modal=True,
+            message_type=Gtk.MessageType.ERROR,
+            buttons=Gtk.ButtonsType.OK,
+            text="Could not prepare the puzzle",
+            secondary_text=str(error) or type(error).__name__,
         )
-        self.side_frame.set_size_request(240, -1)
+        dialog.connect("response", lambda dialog, _response: dialog.destroy())
+        dialog.present()
 
-        self.grid_frame = GridFrame(
-            self.initial_board, self.solved_board, self.board_size, self.side_frame
-        )
+    def show_generating_screen(self) -> None:
+        generating_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        generating_box.set_halign(Gtk.Align.CENTER)
+        generating_box.set_valign(Gtk.Align.CENTER)
+
+        spinner = Gtk.Spinner()
+        spinner.start()
+        generating_box.append(spinner)
+
+        generating_label = Gtk.Label(label="Generating…")
+        generating_label.add_css_class("generating-label")
+        generating_box.append(generating_label)
 
-        self.grid_frame.set_size_request(560, -1)
-        game_box.append(self.grid_frame)
+        if not self.window:
+            self.window = MainApplicationWindow(application=self, title="Pydoku")
+
+        self.stack.append(generating_box)
+        self.window.set_child(generating_box)
+
+    def show_game_screen(self, timer=300, current_board=None) -> None:
+        if not self.window:
+            self.window = MainApplicationWindow(application=self, title="Pydoku")
+            self.window.set_child(self.game_box)
 
-        game_box.append(self.side_frame)
+        self.timer = timer
+        screen = self.game_screens.get(self.board_size)
+        if screen is None:
+            game_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+            side_frame = SideFrame(
+                self.timer,
+                self.restart_game,
+                self.pause_game,
+                self.new_board,
+                self.time_up,
+                self.show_hint,
+                self.toggle_pencil_marks,
+            )
+            side_frame.set_size_request(240, -1)
+
+            grid_frame = GridFrame(
+                self.initial_board,
+                self.solved_board,
+                self.board_size,
+                side_frame,
+                current_board=current_board,
+            )
+            grid_frame.set_size_request(560, -1)
+
+            game_box.append(grid_frame)
+            game_box.append(side_frame)
+            self.game_screens[self.board_size] = (game_box, grid_frame, side_frame)
+        else:
+            game_box, grid_frame, side_frame = screen
+            side_frame.reset(self.timer)
+            grid_frame.load_board(
+                self.initial_board, self.solved_board, current_board=current_board
+            )
+
+        self.grid_frame = grid_frame
+        self.side_frame = side_frame
+        # A board size has a single game screen, so it appears in the stack
+        # at most once however many boards are played on it.
+        if game_box in self.stack:
+            self.stack.remove(game_box)
         self.stack.append(game_box)
         self.window.set_child(game_box)
 
     def read_game_data(self):
-        file_path = os.path.join(os.path.dirname(__file__), "game_data.csv")
-        if not os.path.exists(file_path):
-            print(f"File not found: {file_path}")
-            return None
-
-        game_data = {}
         try:
-            with open(file_path, mode="r") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    for key, value in row.items():
-                        game_data[key] = (
-                            eval(value)
-                            if key
-                            in [
-                                "self.initial_board",
-                                "self.current_board_state",
-                                "self.solved_board",
-                                "self.generated_board",
-                                "self.stack",
-                                "self.current_time",
-                                "self.difficulty",
-                                "self.header_bar",
-                            ]
-                            else value
-                        )
-            print("Game data loaded successfully:", game_data)
-        except Exception as e:
+            game_data = load_game(SAVE_FILE)
+        except (OSError, SaveFileError) as e:
             print(f"Error reading game data: {e}")
+            return None
 
+        if game_data is None:
+            print(f"File not found: {SAVE_FILE}")
         return game_data
 
     def initialize_game_from_data(self, game_data):
@@ -202,43 +320,18 @@ class MainApplication(Gtk.Application):
             print("No game data to initialize.")
             return
 
-        try:
-            self.initial_board = game_data.get("initial_board")
-            self.current_board_state = game_data.get("current_board_state")
-            self.solved_board = game_data.get("solved_board")
-            self.generated_board = game_data.get("generated_board")
-            self.board_size = int(game_data.get("board_size", 9))
-            self.current_difficulty = game_data.get("difficulty")
-            self.timer = int(game_data.get("timer", 300))
-
-            self.stack = game_data.get("stack", [])
-
-            if self.stack:
-                if not self.window:
-                    self.window = MainApplicationWindow(
-                        application=self, title="Pydoku"
-                    )
-
-                # Properly re-construct the stack of UI components
-                for ui_element in self.stack:
-                    if isinstance(ui_element, Gtk.Grid):
-                        print("Reconstructed a Gtk.Grid")
-                    elif isinstance(ui_element, Gtk.Box):
-                        print("Reconstructed a Gtk.Box")
-                    # Add more checks as needed to reconstruct other UI elements
-
-                # Set the last UI element in the stack as the current child
-                last_screen = self.stack[-1]
-                self.window.set_child(last_screen)
-                print("Game UI successfully reconstructed.")
-            else:
-                self.show_difficulty_type(None, self.board_size)
-                print("Showing difficulty type selection.")
-        except Exception as e:
-            print(f"Error initializing game from data: {e}")
+        self.show_difficulty_type(None, game_data.size)
+        self.initial_board = game_data.initial_board
+        self.solved_board = game_data.solved_board
+        self.current_difficulty = game_data.difficulty
+        self.show_game_screen(
+            timer=game_data.timer, current_board=game_data.current_board
+        )
 
     def do_startup(self):
         Gtk.Application.do_startup(self)
+        load_css(css_file=MAIN_CSS)
+        self.puzzle_pool.start()
 
         about_action = Gio.SimpleAction.new("about", None)
         about_action.connect("activate", self.on_about)
@@ -251,9 +344,7 @@ class MainApplication(Gtk.Application):
         self.set_time_action = Gio.SimpleAction.new("set_time", None)
         self.set_time_action.connect("activate", self.on_set_time)
         self.add_action(self.set_time_action)
-
-        game_data = self.read_game_data()
-        self.initialize_game_from_data(game_data)
+        self.startup_timer.mark("startup")
 
     def on_about(self, _action, _param):
         about_dialog = Gtk.AboutDialog(transient_for=self.window, modal=True)
@@ -263,7 +354,7 @@ class MainApplication(Gtk.Application):
         about_dialog.set_comments(
             "Pydoku is a Sudoku puzzle game developed in Python using GTK."
         )
-        about_dialog.set_license(LICENSE)
+        about_dialog.set_license(read_text(LICENSE_FILE))
         about_dialog.set_website("https://github.com/victorchiaka/pydoku")
         about_dialog.set_website_label("Pydoku GitHub Repository")
         about_dialog.set_authors(["Victor Chiaka"])
@@ -272,6 +363,9 @@ class MainApplication(Gtk.Application):
         about_dialog.present()
 
     def on_back(self, _widget):
+        self.cancel_job()
+        if self.side_frame is not None:
+            self.side_frame.stop_timer()
         self.initial_board = None
         if len(self.stack) > 1:
             self.stack.pop()
@@ -283,32 +377,32 @@ class MainApplication(Gtk.Application):
             self.header_bar.remove(self.quit_button)
 
     def on_save(self):
-        file_path = os.path.join(os.path.dirname(__file__), "game_data.csv")
-        directory = os.path.dirname(file_path)
-        os.makedirs(directory, exist_ok=True)
-        if hasattr(self, "grid_frame") and self.grid_frame:
-            self.current_board_state = self.grid_frame.get_current_board_state()
-        game_data = {
-            "self.initial_board": self.initial_board,
-            "self.stack": self.stack,
-            "self.current_board_state": self.current_board_state,
-            "self.difficulty": self.current_difficulty,
-            "self.solved_board": self.solved_board,
-            "self.generated_board": self.initial_board,
-            "self.current_time": self.side_frame.timer if self.side_frame else None,
-            "self.header_bar": self.header_bar,
-        }
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-        with open(file_path, mode="w", newline="") as file:
-            writer = csv.writer(file)
-            for key, value in game_data.items():
-                writer.writerow([key, value])
-
-        print(f"Game data saved to f{file_path}")
+        if self.saved_game_pending:
+            return
+        if self.initial_board is None or self.solved_board is None:
+            if os.path.exists(SAVE_FILE):
+                os.remove(SAVE_FILE)
+            return
+
+        self.current_board_state = self.grid_frame.get_current_board_state()
+        game_data = SavedGame(
+            size=self.board_size,
+            difficulty=self.current_difficulty,
+            timer=self.side_frame.timer,
+            initial_board=self.initial_board,
+            current_board=self.current_board_state,
+            solved_board=self.solved_board,
+        )
+        save_game(SAVE_FILE, game_data)
+
+        print(f"Game data saved to {SAVE_FILE}")
 
     def on_quit(self, _action, _param):
+        self.cancel_job()
         self.on_save()
+        self.puzzle_pool.stop()
+        if self.puzzle_library is not None:
+            self.puzzle_library.close()
         self.quit()
 
     def on_set_time(self, _action, _param):
@@ -361,10 +455,15 @@ class MainApplication(Gtk.Application):
         self.show_sudoku_gameplay_screen(None, self.current_difficulty)
 
     def pause_game(self):
-        if self.side_frame.timer_id:
-            GLib.source_remove(self.side_frame.timer_id)
+        self.side_frame.stop_timer()
         self.show_pause_modal()
 
+    def show_hint(self):
+        self.grid_frame.show_hint()
+
+    def toggle_pencil_marks(self):
+        self.grid_frame.set_pencil_marks(not self.grid_frame.pencil_marks)
+
     def new_board(self):
         self.initial_board = None
         self.stack.pop()
@@ -413,16 +512,12 @@ class MainApplication(Gtk.Application):
         overlay.add_overlay(modal_box)
         self.window.set_child(overlay)
 
-    def count_empty_entries(self, row):
-        return len([entry for entry in row if entry.get_text() == ""])
-
     def time_up(self):
         for row in self.grid_frame.entries:
             for entry in row:
                 entry.set_editable(False)
-            if self.count_empty_entries(row) > 0:
-                self.side_frame.time_label.set_text("You lost")
-                break
-            else:
-                self.side_frame.time_label.set_text("You won")
-                self.side_frame.time_label.add_css_class("win-message")
+        if self.grid_frame.count_empty_entries() > 0:
+            self.side_frame.time_label.set_text("You lost")
+        else:
+            self.side_frame.time_label.set_text("You won")
+            self.side_frame.time_label.add_css_class("win-message")
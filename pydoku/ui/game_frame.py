@@ -3,50 +3,67 @@ import gi
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk, GLib
 
-from math import floor, sqrt
+from algorithms.board import Board, from_glyph, to_glyph
+from algorithms.geometry import geometry
+from algorithms.hints import CandidateGrid
+
+CELL_CSS_CLASSES = {
+    6: "six-by-six-cell",
+    8: "eight-by-eight-cell",
+    9: "nine-by-nine-cell",
+    12: "twelve-by-twelve-cell",
+    25: "twenty-five-by-twenty-five-cell",
+}
 
 
 class GridFrame(Gtk.Frame):
-    def __init__(self, board, solved_board, board_size, side_frame, **kwargs) -> None:
+    def __init__(
+        self, board, solved_board, board_size, side_frame, current_board=None, **kwargs
+    ) -> None:
         super().__init__(**kwargs)
         self.set_hexpand(True)
         self.set_vexpand(True)
         self.add_css_class("grid-frame")
 
         self.solved_board = solved_board
+        self.board_size = board_size
         self.side_frame = side_frame
         self.entries = []
+        self.handler_ids = []
+
+        # Which cells show which text, how many are empty and which are
+        # highlighted, so a keypress only touches the cells that change.
+        self.cell_texts = []
+        self.text_cells = {}
+        self.empty_count = 0
+        self.highlighted = set()
+
+        # Candidates follow every entry so hints and pencil marks never need
+        # a solve; see CandidateGrid.
+        self.candidates = None
+        self.pencil_marks = False
+        self.hint_cell = None
 
         self.grid = Gtk.Grid()
         self.grid.set_column_homogeneous(True)
         self.grid.set_row_homogeneous(True)
 
-        if board_size == 6:
-            subgrid_rows, subgrid_cols = 2, 3
-        else:
-            subgrid_rows, subgrid_cols = floor(sqrt(board_size)), floor(
-                sqrt(board_size)
-            )
+        shape = geometry(board_size)
+        subgrid_rows, subgrid_cols = shape.box_rows, shape.box_cols
 
         for row in range(board_size):
             row_entries = []
+            row_handler_ids = []
             for column in range(board_size):
                 entry = Gtk.Entry()
-                if board_size == 6:
-                    entry.add_css_class("six-by-six-cell")
-                elif board_size == 9:
-                    entry.add_css_class("nine-by-nine-cell")
+                if board_size in CELL_CSS_CLASSES:
+                    entry.add_css_class(CELL_CSS_CLASSES[board_size])
                 entry.set_max_width_chars(1)
                 entry.set_width_chars(1)
                 entry.set_alignment(0.5)
-                entry_text = str(board[row][column])
-                if entry_text == "0":
-                    entry.set_text("")
+                row_handler_ids.append(
                     entry.connect("changed", self.on_entry_change, row, column)
-                else:
-                    entry.set_text(entry_text)
-                    entry.set_editable(False)
-                    entry.add_css_class("filled-entry")
+                )
                 self.grid.attach(entry, column, row, 1, 1)
                 row_entries.append(entry)
 
@@ -59,11 +76,78 @@ class GridFrame(Gtk.Frame):
                 if (column + 1) % subgrid_cols == 0 and (column + 1) != board_size:
                     entry.get_style_context().add_class("right-border")
             self.entries.append(row_entries)
+            self.handler_ids.append(row_handler_ids)
+
+        self.load_board(board, solved_board, current_board)
 
         self.set_child(self.grid)
 
+    def load_board(self, board, solved_board, current_board=None) -> None:
+        # Puts a new game into the existing entries, so switching boards
+        # resets the widgets instead of building a new tree.
+        board_size = self.board_size
+        self.solved_board = solved_board
+        self.cell_texts = [["" for _ in range(board_size)] for _ in range(board_size)]
+        self.text_cells = {}
+        self.empty_count = board_size * board_size
+        self.highlighted = set()
+        self.candidates = CandidateGrid(board, solved_board)
+        self.hint_cell = None
+
+        for row in range(board_size):
+            for column in range(board_size):
+                entry = self.entries[row][column]
+                handler_id = self.handler_ids[row][column]
+                entry.handler_block(handler_id)
+                for css_class in (
+                    "filled-entry",
+                    "correct-position",
+                    "conflict-highlight",
+                    "hint-cell",
+                ):
+                    entry.remove_css_class(css_class)
+                value = board[row, column]
+                text = to_glyph(value, board_size)
+                entry.set_text(text)
+                entry.set_editable(value == 0)
+                if value:
+                    entry.add_css_class("filled-entry")
+                    self.index_cell_text(row, column, text)
+                entry.handler_unblock(handler_id)
+        self.show_pencil_marks(range(board_size * board_size))
+
+        if current_board is not None:
+            for row in range(board_size):
+                for column in range(board_size):
+                    value = current_board[row, column]
+                    if board[row, column] == 0 and value:
+                        self.entries[row][column].set_text(to_glyph(value, board_size))
+
+    def index_cell_text(self, row, column, text) -> None:
+        previous = self.cell_texts[row][column]
+        if previous == text:
+            return
+        if previous:
+            self.text_cells[previous].discard((row, column))
+        else:
+            self.empty_count -= 1
+        if text:
+            self.text_cells.setdefault(text, set()).add((row, column))
+        else:
+            self.empty_count += 1
+        self.cell_texts[row][column] = text
+
     def on_entry_change(self, _widget, row, column):
         choice = _widget.get_text()
+        self.index_cell_text(row, column, choice)
+        self.show_pencil_marks(
+            self.candidates.set_value(
+                row * self.board_size + column,
+                max(from_glyph(choice, self.board_size), 0),
+            )
+        )
+        if self.hint_cell == (row, column):
+            self.clear_hint()
 
         _widget.remove_css_class("correct-position")
         _widget.remove_css_class("filled-entry")
@@ -72,7 +156,7 @@ class GridFrame(Gtk.Frame):
             self.remove_highlights()
             return
 
-        if str(self.solved_board[row][column]) == str(choice):
+        if self.solved_board[row, column] == from_glyph(choice, self.board_size):
             _widget.add_css_class("correct-position")
             _widget.set_editable(False)
             self.check_winning()
@@ -80,30 +164,72 @@ class GridFrame(Gtk.Frame):
             self.highlight_similar(choice)
 
     def highlight_similar(self, choice) -> None:
-        for row in range(len(self.solved_board)):
-            for column in range(len(self.solved_board[row])):
-                entry = self.get_entry_at_position(row, column)
-                if entry.get_text() == choice:
-                    entry.add_css_class("conflict-highlight")
-                else:
-                    entry.remove_css_class("conflict-highlight")
+        similar = self.text_cells.get(choice, set())
+        for row, column in self.highlighted - similar:
+            self.get_entry_at_position(row, column).remove_css_class(
+                "conflict-highlight"
+            )
+        for row, column in similar - self.highlighted:
+            self.get_entry_at_position(row, column).add_css_class("conflict-highlight")
+        self.highlighted = set(similar)
 
     def remove_highlights(self) -> None:
-        for row in range(len(self.solved_board)):
-            for column in range(len(self.solved_board[row])):
-                entry = self.get_entry_at_position(row, column)
-                entry.remove_css_class("conflict-highlight")
+        for row, column in self.highlighted:
+            self.get_entry_at_position(row, column).remove_css_class(
+                "conflict-highlight"
+            )
+        self.highlighted.clear()
+
+    def show_pencil_marks(self, cells) -> None:
+        # Pencil marks are the placeholder text of the empty entries.
+        if not self.pencil_marks:
+            return
+        for index in cells:
+            row, column = divmod(index, self.board_size)
+            marks = "".join(
+                to_glyph(value, self.board_size)
+                for value in self.candidates.candidates_at(row, column)
+            )
+            self.entries[row][column].set_placeholder_text(marks or None)
+
+    def set_pencil_marks(self, enabled) -> None:
+        self.pencil_marks = enabled
+        if enabled:
+            self.grid.add_css_class("pencil-marks")
+            self.show_pencil_marks(range(self.board_size * self.board_size))
+        else:
+            self.grid.remove_css_class("pencil-marks")
+            for row in self.entries:
+                for entry in row:
+                    entry.set_placeholder_text(None)
+
+    def show_hint(self) -> None:
+        self.clear_hint()
+        hint = self.candidates.hint()
+        if hint is None:
+            self.side_frame.show_message("No hint")
+            return
+        glyph = to_glyph(hint.value, self.board_size)
+        if hint.technique == "mistake":
+            self.side_frame.show_message(f"Mistake, should be {glyph}")
+        else:
+            self.side_frame.show_message(f"{hint.technique.capitalize()}: {glyph}")
+        self.hint_cell = (hint.row, hint.column)
+        entry = self.entries[hint.row][hint.column]
+        entry.add_css_class("hint-cell")
+        entry.grab_focus()
+
+    def clear_hint(self) -> None:
+        if self.hint_cell is not None:
+            row, column = self.hint_cell
+            self.entries[row][column].remove_css_class("hint-cell")
+            self.hint_cell = None
 
     def get_entry_at_position(self, row, column):
         return self.entries[row][column]
 
     def count_empty_entries(self):
-        count = 0
-        for row in self.entries:
-            for entry in row:
-                if entry.get_text() == "":
-                    count += 1
-        return count
+        return self.empty_count
 
     def check_winning(self):
         if self.count_empty_entries() == 0 and self.side_frame.timer > 1:
@@ -113,7 +239,14 @@ class GridFrame(Gtk.Frame):
             self.side_frame.timer_id = None
 
     def get_current_board_state(self):
-        return [[entry.get_text() for entry in row] for row in self.entries]
+        return Board(
+            self.board_size,
+            (
+                max(from_glyph(entry.get_text(), self.board_size), 0)
+                for row in self.entries
+                for entry in row
+            ),
+        )
 
 
 class SideFrame(Gtk.Frame):
@@ -124,6 +257,8 @@ class SideFrame(Gtk.Frame):
         pause_callback,
         new_board_callback,
         time_up_callback,
+        hint_callback,
+        pencil_marks_callback,
     ) -> None:
         super().__init__()
 
@@ -131,6 +266,8 @@ class SideFrame(Gtk.Frame):
         self.pause_callback = pause_callback
         self.new_board_callback = new_board_callback
         self.time_up_callback = time_up_callback
+        self.hint_callback = hint_callback
+        self.pencil_marks_callback = pencil_marks_callback
 
         self.timer = timer
         self.seconds = self.timer % 60
@@ -152,12 +289,15 @@ class SideFrame(Gtk.Frame):
         self.time_label.add_css_class("time-label")
         timer_box.append(self.time_label)
 
+        self.message_label = Gtk.Label()
+        self.message_label.add_css_class("message-label")
+
         action_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=20)
         action_box.set_hexpand(True)
         action_box.set_vexpand(True)
         action_box.set_halign(Gtk.Align.CENTER)
         action_box.set_valign(Gtk.Align.CENTER)
-        actions = ["Pause", "Restart", "New board"]
+        actions = ["Pause", "Restart", "New board", "Hint", "Pencil marks"]
         for action in actions:
             action_button = Gtk.Button(label=action)
             action_button.connect("clicked", self.on_sideframe_action, action)
@@ -165,6 +305,7 @@ class SideFrame(Gtk.Frame):
             action_box.append(action_button)
 
         side_box.append(timer_box)
+        side_box.append(self.message_label)
         side_box.append(action_box)
 
         self.set_child(side_box)
@@ -178,6 +319,13 @@ class SideFrame(Gtk.Frame):
             self.pause_callback()
         elif _param == "New board":
             self.new_board_callback()
+        elif _param == "Hint":
+            self.hint_callback()
+        elif _param == "Pencil marks":
+            self.pencil_marks_callback()
+
+    def show_message(self, text) -> None:
+        self.message_label.set_text(text)
 
     def update_timer_label(self, timer):
         self.timer = timer
@@ -185,6 +333,19 @@ class SideFrame(Gtk.Frame):
         self.minutes = (self.timer // 60) % 60
         self.time_label.set_text(f"{self.minutes:02}:{self.seconds:02}")
 
+    def reset(self, timer) -> None:
+        self.stop_timer()
+        self.time_label.remove_css_class("time-up")
+        self.time_label.remove_css_class("win-message")
+        self.message_label.set_text("")
+        self.update_timer_label(timer)
+        self.start_timer()
+
+    def stop_timer(self) -> None:
+        if self.timer_id:
+            GLib.source_remove(self.timer_id)
+            self.timer_id = None
+
     def start_timer(self):
         if self.timer_id:
             GLib.source_remove(self.timer_id)
@@ -202,5 +363,6 @@ class SideFrame(Gtk.Frame):
             return True
         self.time_label.set_text("TIME'S UP")
         self.time_label.add_css_class("time-up")
+        self.timer_id = None
         self.time_up_callback()
         return False
@@ -0,0 +1,53 @@
+from typing import Any, Callable
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+from algorithms.errors import SearchCancelled
+from algorithms.tasks import Steps, Task
+
+
+class IdleJob:
+    # Runs ``steps`` (see algorithms.tasks) on the GTK main loop itself, a
+    # slice of at most ``slice_seconds`` per idle callback, so the window
+    # keeps drawing and handling input in between without a thread.
+    def __init__(
+        self,
+        steps: Steps,
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        slice_seconds: float = 0.008,
+    ) -> None:
+        self.task = Task(steps)
+        self.on_done = on_done
+        self.on_error = on_error
+        self.slice_seconds = slice_seconds
+        self.source_id = None
+
+    def start(self) -> None:
+        self.source_id = GLib.idle_add(self.run_slice)
+
+    def cancel(self) -> None:
+        if self.source_id is not None:
+            GLib.source_remove(self.source_id)
+            self.source_id = None
+            self.task.close()
+
+    def run_slice(self) -> bool:
+        try:
+            # The clock is read after every step: a single step can take
+            # milliseconds on a large board.
+            if not self.task.run_for(self.slice_seconds, check_every=1):
+                return GLib.SOURCE_CONTINUE
+        except SearchCancelled:
+            self.source_id = None
+            return GLib.SOURCE_REMOVE
+        except Exception as error:
+            self.source_id = None
+            self.on_error(error)
+            return GLib.SOURCE_REMOVE
+        self.source_id = None
+        self.on_done(self.task.result)
+        return GLib.SOURCE_REMOVE
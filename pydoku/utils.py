@@ -1,9 +1,34 @@
+import sys
+import time
+from functools import lru_cache
+
 import gi
 
 gi.require_version(namespace="Gtk", version="4.0")
 from gi.repository import Gtk, Gdk
 
 
+@lru_cache(maxsize=None)
+def read_text(path):
+    with open(path) as file:
+        return file.read()
+
+
+class StartupTimer:
+    # Collects named points in time since ``started``, for a report of how
+    # long startup takes to reach the first window and frame.
+    def __init__(self, started=None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.marks = []
+
+    def mark(self, name) -> None:
+        self.marks.append((name, time.perf_counter() - self.started))
+
+    def report(self, file=sys.stderr) -> None:
+        for name, elapsed in self.marks:
+            print(f"startup: {name:<20} {elapsed * 1000:8.1f} ms", file=file)
+
+
 def load_css(css_file):
     css_provider = Gtk.CssProvider()
     css_provider.load_from_path(css_file)
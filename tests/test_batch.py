@@ -0,0 +1,45 @@
+import random
+
+from algorithms.batch import PuzzleLine, generate_chunk, read_puzzles, solve_many
+from algorithms.grader import grade_board
+from algorithms.solver import Solver
+
+PUZZLE = "1.3.5.4.6.2.2.1.6.5.4.3.3.2.4.6.4.1."
+
+
+def test_read_puzzles_skips_comments_and_reports_missing_files(tmp_path):
+    first = tmp_path / "first.sdm"
+    first.write_text(f"# comment\n\n{PUZZLE} 12\n")
+    second = tmp_path / "second.txt"
+    second.write_text(f"{PUZZLE}\n")
+    missing = str(tmp_path / "missing.txt")
+    assert list(read_puzzles([str(first), missing, str(second)])) == [
+        PuzzleLine(f"{first}:3", PUZZLE, None),
+        PuzzleLine(missing, None, "No such file or directory"),
+        PuzzleLine(f"{second}:1", PUZZLE, None),
+    ]
+
+
+def test_solve_many_passes_read_errors_through(tmp_path):
+    missing = str(tmp_path / "missing.txt")
+    results = list(solve_many(read_puzzles([missing]), workers=1))
+    assert [(result.location, result.error) for result in results] == [
+        (missing, "No such file or directory")
+    ]
+
+
+def test_generate_chunk_ignores_the_global_random():
+    random.seed(1)
+    first = generate_chunk(0, 3, 9, "MEDIUM", 7, True, "transform")
+    random.seed(2)
+    again = generate_chunk(1, 2, 9, "MEDIUM", 7, True, "transform")
+    assert first[1:] == again
+    assert random.getstate() == random.Random(2).getstate()
+
+
+def test_generated_puzzles_come_with_solution_and_grade():
+    for puzzle in generate_chunk(0, 2, 9, "HARD", 3, True, "transform", graded=True):
+        assert puzzle.in_band
+        assert puzzle.grade == grade_board(puzzle.board)
+        solution = Solver(puzzle.board.copy(), 9, "propagation").solve_board()
+        assert puzzle.solution == solution
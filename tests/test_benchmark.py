@@ -0,0 +1,31 @@
+import pytest
+
+from algorithms.benchmark import BaselineError, compare, run_benchmarks
+
+
+@pytest.fixture(scope="module")
+def results():
+    return run_benchmarks(sizes=(6,), backends=("propagation",), count=2, repeat=1)
+
+
+def test_same_run_has_no_regressions(results):
+    assert compare(results, results) == []
+
+
+def test_regression_is_reported(results):
+    baseline = {**results, "cases": [dict(case) for case in results["cases"]]}
+    baseline["cases"][0]["nodes"] = results["cases"][0]["nodes"] // 2 - 1
+    assert len(compare(results, baseline)) == 1
+
+
+@pytest.mark.parametrize("key", ["version", "seed", "count"])
+def test_other_settings_are_refused(results, key):
+    with pytest.raises(BaselineError, match=key):
+        compare(results, {**results, key: results[key] + 1})
+
+
+def test_other_puzzles_are_refused(results):
+    cases = [dict(case) for case in results["cases"]]
+    cases[-1]["corpus"] = "0" * 64
+    with pytest.raises(BaselineError, match="other puzzles"):
+        compare(results, {**results, "cases": cases})
@@ -0,0 +1,44 @@
+from algorithms.board import Board
+from algorithms.cache import SolutionCache
+from algorithms.transforms import Transform, canonical_transform
+
+SOLUTION = Board.from_line("123456456123231564564231312645645312")
+PUZZLE = Board.from_line(".2345.4561.3231.6456.2313.2645.4531.")
+
+
+def agrees(puzzle, solution):
+    return all(
+        given in (0, value) for given, value in zip(puzzle.cells, solution.cells)
+    )
+
+
+def test_canonical_transform_inverse_maps_solution_onto_givens():
+    transform = canonical_transform(PUZZLE.cells, 6)
+    assert transform.invert(transform.apply(PUZZLE.cells)) == list(PUZZLE.cells)
+    canonical_solution = transform.apply(SOLUTION.cells)
+    restored = Board(6, transform.invert(canonical_solution))
+    assert restored == SOLUTION
+    assert agrees(PUZZLE, restored)
+
+
+def test_equivalent_puzzle_is_a_cache_hit():
+    # The first two rows and the last two columns swapped and the values
+    # relabeled. 6x6 boxes are not square, so transposing is not a symmetry.
+    shuffle = Transform(
+        6, False, (1, 0, 2, 3, 4, 5), (0, 1, 2, 3, 5, 4), (0, 3, 1, 2, 6, 4, 5)
+    )
+    puzzle = Board(6, shuffle.apply(PUZZLE.cells))
+    expected = Board(6, shuffle.apply(SOLUTION.cells))
+    with SolutionCache() as cache:
+        cache.store(PUZZLE, SOLUTION)
+        solution = cache.lookup(puzzle)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert solution == expected
+    assert agrees(puzzle, solution)
+
+
+def test_solve_caches_the_solution():
+    with SolutionCache() as cache:
+        assert cache.solve(PUZZLE) == SOLUTION
+        assert cache.lookup(PUZZLE) == SOLUTION
+    assert (cache.hits, cache.misses) == (1, 1)
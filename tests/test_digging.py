@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from algorithms.board import Board
+from algorithms.digging import SYMMETRIES, Digger, cell_orbits, symmetric_cell
+from algorithms.solver import Solver
+from algorithms.transforms import random_solved_grid
+
+
+def count_solutions(cells: list[int], size: int) -> int:
+    return Solver(Board(size, cells), size, "propagation").count_solutions(2)
+
+
+@pytest.mark.parametrize("symmetry", SYMMETRIES)
+@pytest.mark.parametrize("size", [6, 9])
+def test_dig_makes_minimal_symmetric_unique_puzzles(size, symmetry):
+    rng = random.Random(f"{size}-{symmetry}")
+    solution = random_solved_grid(size, rng)
+    digger = Digger(solution, size, symmetry, rng=rng)
+    digger.dig()
+    puzzle = digger.values
+    assert digger.exhausted()
+    assert all(given in (0, value) for given, value in zip(puzzle, solution))
+    for index in range(size * size):
+        image = symmetric_cell(index, size, symmetry)
+        assert bool(puzzle[index]) == bool(puzzle[image])
+    assert count_solutions(puzzle, size) == 1
+    # Minimal for the symmetry: clearing any orbit of clues left over breaks
+    # uniqueness.
+    for orbit in cell_orbits(size, symmetry):
+        if puzzle[orbit[0]]:
+            cleared = list(puzzle)
+            for index in orbit:
+                cleared[index] = 0
+            assert count_solutions(cleared, size) == 2
+
+
+def test_dig_limit_and_rewind():
+    rng = random.Random(0)
+    solution = random_solved_grid(9, rng)
+    digger = Digger(solution, 9, rng=rng)
+    assert digger.dig(limit=20) == 20
+    assert digger.values.count(0) == 20
+    position = digger.position
+    digger.dig()
+    digger.rewind(position)
+    assert digger.values.count(0) == 20
+    assert count_solutions(digger.values, 9) == 1
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from algorithms.generator import Generator
+from algorithms.grader import difficulty_of, grade_board
+from algorithms.solver import Solver
+
+
+@pytest.mark.parametrize("difficulty", ["EASY", "MEDIUM", "HARD", "EXPERT"])
+@pytest.mark.parametrize("seed", range(3))
+def test_graded_board_lands_in_band(difficulty, seed):
+    generator = Generator(
+        difficulty,
+        9,
+        unique=True,
+        method="transform",
+        graded=True,
+        rng=random.Random(f"{difficulty}-{seed}"),
+    )
+    board = generator.generate_board()
+    assert generator.in_band
+    assert difficulty_of(grade_board(board)) == difficulty
+    solutions = Solver(board.copy(), 9, "propagation").count_solutions(2)
+    assert solutions == 1
+
+
+def test_time_limit_settles_for_the_closest_board():
+    generator = Generator(
+        "HARD",
+        6,
+        unique=True,
+        method="transform",
+        graded=True,
+        rng=random.Random(0),
+        time_limit=0,
+    )
+    board = generator.generate_board()
+    assert generator.in_band is not None
+    assert generator.grade == grade_board(board)
+
+
+def test_ungraded_board_has_no_band():
+    generator = Generator("EASY", 9, unique=True, method="transform")
+    generator.generate_board()
+    assert generator.in_band is None
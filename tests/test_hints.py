@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from algorithms.benchmark import PATHOLOGICAL
+from algorithms.board import Board
+from algorithms.constraints import ConstraintState
+from algorithms.digging import Digger
+from algorithms.hints import CandidateGrid
+from algorithms.solver import Solver
+from algorithms.transforms import random_solved_grid
+
+
+def dug_puzzle(size: int, seed: int) -> tuple[Board, Board]:
+    rng = random.Random(seed)
+    solution = random_solved_grid(size, rng)
+    digger = Digger(solution, size, rng=rng)
+    digger.dig()
+    return Board(size, digger.values), Board(size, solution)
+
+
+def pathological_puzzle(name: str) -> tuple[Board, Board]:
+    puzzle = Board.from_line(PATHOLOGICAL[name])
+    return puzzle, Solver(puzzle.copy(), 9, "propagation").solve_board()
+
+
+PUZZLES = [dug_puzzle(size, seed) for size in (6, 9, 12) for seed in range(2)] + [
+    pathological_puzzle(name) for name in ("ai-escargot", "golden-nugget")
+]
+
+
+@pytest.mark.parametrize("with_solution", [False, True])
+@pytest.mark.parametrize("puzzle, solution", PUZZLES)
+def test_following_hints_solves_the_puzzle(puzzle, solution, with_solution):
+    grid = CandidateGrid(puzzle, solution if with_solution else None)
+    for _ in range(puzzle.empty_count()):
+        hint = grid.hint()
+        assert hint is not None
+        assert hint.technique != "mistake"
+        assert hint.value == solution[hint.row, hint.column]
+        grid.set_value(hint.row * puzzle.size + hint.column, hint.value)
+    assert grid.values == list(solution.cells)
+    assert grid.hint() is None
+
+
+def test_mistake_hint_gives_the_right_value():
+    puzzle, solution = dug_puzzle(9, 0)
+    grid = CandidateGrid(puzzle, solution)
+    index = puzzle.cells.find(0)
+    right = solution.cells[index]
+    grid.set_value(index, right % 9 + 1)
+    hint = grid.hint()
+    assert (hint.row * 9 + hint.column, hint.value) == (index, right)
+    assert hint.technique == "mistake"
+    grid.set_value(index, 0)
+    assert grid.hint().technique != "mistake"
+
+
+def test_candidates_follow_every_entry():
+    puzzle, solution = dug_puzzle(9, 0)
+    grid = CandidateGrid(puzzle)
+    rng = random.Random(0)
+    empty = [index for index, value in enumerate(puzzle.cells) if not value]
+    for _ in range(200):
+        index = rng.choice(empty)
+        # Wrong values and clashes too, the way a player can enter them.
+        value = rng.choice([0, solution.cells[index], rng.randint(1, 9)])
+        grid.set_value(index, value)
+        constraints = ConstraintState(9)
+        for cell, value in enumerate(grid.values):
+            if value:
+                constraints.place(value, *divmod(cell, 9))
+        for cell, value in enumerate(grid.values):
+            expected = 0 if value else constraints.candidates(*divmod(cell, 9))
+            assert grid.candidates[cell] == expected
@@ -0,0 +1,116 @@
+import struct
+
+import pytest
+
+from algorithms.board import Board
+from algorithms.library import (
+    DATA_START,
+    EXTENT,
+    HEADER,
+    MAGIC,
+    MAX_GRADE,
+    VERSION,
+    LibraryError,
+    PuzzleLibrary,
+    PuzzleLibraryWriter,
+    record_width,
+)
+
+SOLUTION = Board.from_line("123456456123231564564231312645645312")
+PUZZLE = Board.from_line("1.3.5.4.6.2.2.1.6.5.4.3.3.2.4.6.4.1.")
+
+
+def write_library(path, grades=(7,)):
+    with PuzzleLibraryWriter(str(path)) as writer:
+        writer.append((PUZZLE, SOLUTION, "easy", grade) for grade in grades)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    write_library(path, grades=(1, 2))
+    write_library(path, grades=(3,))
+    with PuzzleLibrary(str(path)) as library:
+        assert library.count(6, "EASY") == 3
+        assert library.count(9, "EASY") == 0
+        assert [library.get(6, "EASY", n)[2] for n in range(3)] == [1, 2, 3]
+        assert library.get(6, "EASY", 2)[:2] == (PUZZLE, SOLUTION)
+        with pytest.raises(IndexError):
+            library.get(6, "EASY", 3)
+
+
+def test_grade_is_clamped(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    write_library(path, grades=(MAX_GRADE + 1000,))
+    with PuzzleLibrary(str(path)) as library:
+        assert library.get(6, "EASY", 0)[2] == MAX_GRADE
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    path.write_bytes(b"")
+    with pytest.raises(LibraryError, match="truncated"):
+        PuzzleLibrary(str(path))
+
+
+def test_truncated_header(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    write_library(path)
+    path.write_bytes(path.read_bytes()[: DATA_START - 1])
+    with pytest.raises(LibraryError, match="truncated"):
+        PuzzleLibrary(str(path))
+    with pytest.raises(LibraryError, match="truncated"):
+        PuzzleLibraryWriter(str(path))
+
+
+def test_truncated_records(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    write_library(path, grades=(1, 2))
+    path.write_bytes(path.read_bytes()[: DATA_START + record_width(6)])
+    with pytest.raises(LibraryError, match="damaged"):
+        PuzzleLibrary(str(path))
+
+
+def test_garbage(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    path.write_bytes(bytes(range(256)) * (DATA_START // 256 + 4))
+    with pytest.raises(LibraryError, match="Not a pydoku puzzle library"):
+        PuzzleLibrary(str(path))
+
+
+def test_wrong_version(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    write_library(path)
+    data = bytearray(path.read_bytes())
+    HEADER.pack_into(data, 0, MAGIC, VERSION + 1, 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(LibraryError, match="version"):
+        PuzzleLibrary(str(path))
+
+
+@pytest.mark.parametrize(
+    "extent",
+    [
+        (6, 0, DATA_START, 1000),
+        (6, 0, DATA_START - 1, 1),
+        (6, 9, DATA_START, 1),
+        (0, 0, DATA_START, 1),
+    ],
+)
+def test_bad_extent(tmp_path, extent):
+    path = tmp_path / "puzzles.pdl"
+    write_library(path)
+    data = bytearray(path.read_bytes())
+    EXTENT.pack_into(data, HEADER.size, *extent)
+    path.write_bytes(bytes(data))
+    with pytest.raises(LibraryError, match="damaged"):
+        PuzzleLibrary(str(path))
+
+
+def test_too_many_extents(tmp_path):
+    path = tmp_path / "puzzles.pdl"
+    write_library(path)
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<I", data, 8, 1 << 20)
+    path.write_bytes(bytes(data))
+    with pytest.raises(LibraryError):
+        PuzzleLibrary(str(path))
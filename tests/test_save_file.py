@@ -0,0 +1,101 @@
+import zlib
+
+import pytest
+
+from algorithms.board import Board
+from pydoku.save_file import (
+    HEADER,
+    MAGIC,
+    TRAILER,
+    VERSION,
+    SavedGame,
+    SaveFileError,
+    decode_game,
+    encode_game,
+    load_game,
+    save_game,
+)
+
+SOLVED = Board(
+    9,
+    b"\x05\x03\x04\x06\x07\x08\x09\x01\x02"
+    b"\x06\x07\x02\x01\x09\x05\x03\x04\x08"
+    b"\x01\x09\x08\x03\x04\x02\x05\x06\x07"
+    b"\x08\x05\x09\x07\x06\x01\x04\x02\x03"
+    b"\x04\x02\x06\x08\x05\x03\x07\x09\x01"
+    b"\x07\x01\x03\x09\x02\x04\x08\x05\x06"
+    b"\x09\x06\x01\x05\x03\x07\x02\x08\x04"
+    b"\x02\x08\x07\x04\x01\x09\x06\x03\x05"
+    b"\x03\x04\x05\x02\x08\x06\x01\x07\x09",
+)
+
+
+def make_game() -> SavedGame:
+    initial = SOLVED.copy()
+    for index in range(0, 81, 2):
+        initial.cells[index] = 0
+    current = initial.copy()
+    current.cells[0] = SOLVED.cells[0]
+    return SavedGame(9, "Hard", 125, initial, current, SOLVED.copy())
+
+
+def test_round_trip():
+    game = make_game()
+    assert decode_game(encode_game(game)) == game
+
+
+def test_round_trip_through_file(tmp_path):
+    path = str(tmp_path / "saves" / "game.sav")
+    game = make_game()
+    save_game(path, game)
+    assert load_game(path) == game
+
+
+def test_missing_file_loads_as_none(tmp_path):
+    assert load_game(str(tmp_path / "missing.sav")) is None
+
+
+def test_bad_checksum():
+    data = bytearray(encode_game(make_game()))
+    data[HEADER.size + 3] ^= 0xFF
+    with pytest.raises(SaveFileError, match="checksum"):
+        decode_game(bytes(data))
+
+
+@pytest.mark.parametrize("length", [0, HEADER.size, HEADER.size + TRAILER.size, 100])
+def test_truncated(length):
+    data = encode_game(make_game())
+    with pytest.raises(SaveFileError):
+        decode_game(data[:length])
+
+
+def test_trailing_garbage():
+    with pytest.raises(SaveFileError, match="length"):
+        decode_game(encode_game(make_game()) + b"\x00")
+
+
+def test_wrong_magic():
+    data = b"XXXX" + encode_game(make_game())[4:]
+    with pytest.raises(SaveFileError, match="Not a pydoku save file"):
+        decode_game(data)
+
+
+def corrupt(data: bytes, index: int, value: int) -> bytes:
+    # Changes one byte and fixes up the checksum, so only the change is wrong.
+    payload = bytearray(data[: -TRAILER.size])
+    payload[index] = value
+    return bytes(payload) + TRAILER.pack(zlib.crc32(payload))
+
+
+def test_unsupported_size():
+    # Size 7 with the length and checksum of a valid 7x7 save.
+    payload = HEADER.pack(MAGIC, VERSION, 7, 0, 0, 0) + bytes(3 * 49)
+    with pytest.raises(SaveFileError, match="size 7"):
+        decode_game(payload + TRAILER.pack(zlib.crc32(payload)))
+
+
+@pytest.mark.parametrize("board", range(3))
+def test_cell_value_above_size(board):
+    data = encode_game(make_game())
+    with pytest.raises(SaveFileError, match="above 9"):
+        decode_game(corrupt(data, HEADER.size + board * 81 + 40, 10))
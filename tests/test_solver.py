@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from algorithms.benchmark import PATHOLOGICAL
+from algorithms.board import Board
+from algorithms.solver import Solver, has_conflicts
+from algorithms.transforms import random_solved_grid
+
+HARD_9X9 = [
+    Board.from_line(PATHOLOGICAL[name]) for name in ("ai-escargot", "platinum-blonde")
+]
+
+
+def sparse_16x16() -> Board:
+    # A random solution with about half its cells cleared.
+    rng = random.Random(16)
+    cells = random_solved_grid(16, rng)
+    for index in rng.sample(range(256), 128):
+        cells[index] = 0
+    return Board(16, cells)
+
+
+def assert_solves(puzzle: Board, solved: Board) -> None:
+    assert 0 not in solved.cells
+    assert not has_conflicts(solved)
+    for given, value in zip(puzzle.cells, solved.cells):
+        assert given in (0, value)
+
+
+@pytest.mark.parametrize("puzzle", HARD_9X9)
+def test_dlx_solves_hard_9x9(puzzle):
+    solved = Solver(puzzle.copy(), 9, "dlx").solve_board()
+    assert_solves(puzzle, solved)
+
+
+def test_dlx_solves_16x16():
+    puzzle = sparse_16x16()
+    assert_solves(puzzle, Solver(puzzle.copy(), 16, "dlx").solve_board())
+
+
+@pytest.mark.parametrize("puzzle", HARD_9X9)
+def test_propagation_solves_hard_9x9(puzzle):
+    solved = Solver(puzzle.copy(), 9, "propagation").solve_board()
+    assert_solves(puzzle, solved)
+    # The puzzle is unique, so every backend must find the same solution.
+    assert solved == Solver(puzzle.copy(), 9, "dlx").solve_board()
+
+
+def test_propagation_solves_16x16():
+    puzzle = sparse_16x16()
+    assert_solves(puzzle, Solver(puzzle.copy(), 16, "propagation").solve_board())
+
+
+@pytest.mark.parametrize("backend", ["dlx", "propagation"])
+def test_count_solutions_stops_at_the_limit(backend):
+    # An empty board has billions of solutions, so this only returns if
+    # counting stops early.
+    assert Solver(Board(9), 9, backend).count_solutions(2) == 2
+    assert Solver(Board(9), 9, backend).count_solutions(5) == 5
+    assert Solver(sparse_16x16(), 16, backend).count_solutions(2) == 2
+
+
+@pytest.mark.parametrize("backend", ["dlx", "propagation"])
+def test_count_solutions_of_unique_and_unsolvable_puzzles(backend):
+    for puzzle in HARD_9X9:
+        assert Solver(puzzle.copy(), 9, backend).count_solutions(2) == 1
+    unsolvable = HARD_9X9[0].copy()
+    # Clashes with the 1 in the top left corner.
+    unsolvable[0, 8] = 1
+    assert Solver(unsolvable, 9, backend).count_solutions(2) == 0
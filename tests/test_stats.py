@@ -0,0 +1,37 @@
+import time
+
+from algorithms.stats import SearchStats
+from algorithms.tasks import Task
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_phases_leave_out_suspended_and_nested_time():
+    stats = SearchStats()
+
+    def inner():
+        busy(0.02)
+        yield
+        return "graded"
+
+    def outer():
+        busy(0.01)
+        yield
+        result = yield from stats.phase_steps("grading", inner())
+        with stats.phase("fill"):
+            busy(0.01)
+        return result
+
+    task = Task(stats.phase_steps("removal", outer()))
+    while not task.step():
+        time.sleep(0.05)
+    assert task.result == "graded"
+    times = stats.phase_times
+    assert 0.02 <= times["grading"] < 0.04
+    assert 0.01 <= times["removal"] < 0.03
+    assert 0.01 <= times["fill"] < 0.03
+    assert sum(times.values()) < 0.1
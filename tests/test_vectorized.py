@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from algorithms.board import Board
+from algorithms.constraints import ConstraintState
+from algorithms.solver import has_conflicts
+from algorithms.transforms import random_solved_grid
+
+np = pytest.importorskip("numpy")
+vectorized = pytest.importorskip("algorithms.vectorized")
+
+SIZES = [6, 8, 9, 12, 16, 25]
+
+
+def partial_boards(size: int, count: int = 4) -> list[list[int]]:
+    # Random solutions with a random share of their cells cleared, from
+    # none to all.
+    rng = random.Random(size)
+    boards = []
+    for number in range(count):
+        cells = random_solved_grid(size, rng)
+        for index in rng.sample(range(size * size), size * size * number // 3):
+            cells[index] = 0
+        boards.append(cells)
+    return boards
+
+
+def as_array(boards: list[list[int]], size: int):
+    return np.array(boards, dtype=np.int64).reshape(len(boards), size, size)
+
+
+def constraint_state(cells: list[int], size: int) -> ConstraintState:
+    constraints = ConstraintState(size)
+    for index, value in enumerate(cells):
+        if value:
+            constraints.place(value, *divmod(index, size))
+    return constraints
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_unit_and_candidate_masks_match_constraint_state(size):
+    boards = partial_boards(size)
+    rows, columns, subgrids = vectorized.unit_masks(as_array(boards, size))
+    masks = vectorized.candidate_masks(as_array(boards, size))
+    counts = vectorized.candidate_counts(as_array(boards, size))
+    for number, cells in enumerate(boards):
+        constraints = constraint_state(cells, size)
+        assert rows[number].tolist() == constraints.rows
+        assert columns[number].tolist() == constraints.columns
+        assert subgrids[number].tolist() == constraints.subgrids
+        for index, value in enumerate(cells):
+            row, column = divmod(index, size)
+            expected = 0 if value else constraints.candidates(row, column)
+            assert int(masks[number, row, column]) == expected
+            assert int(counts[number, row, column]) == expected.bit_count()
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_checks_match_the_scalar_ones(size):
+    boards = partial_boards(size)
+    # The solution with its first value copied to the next cell.
+    clashing = list(boards[0])
+    clashing[1] = clashing[0]
+    boards.append(clashing)
+    array = as_array(boards, size)
+    conflict_free = vectorized.conflict_free(array).tolist()
+    solved = vectorized.is_solved(array).tolist()
+    for number, cells in enumerate(boards):
+        board = Board(size, cells)
+        assert conflict_free[number] == (not has_conflicts(board))
+        assert solved[number] == (0 not in cells and not has_conflicts(board))
+    assert solved[0] and not conflict_free[-1]